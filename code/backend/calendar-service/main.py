@@ -327,14 +327,26 @@ async def summary():
         "summary": f"총 {total_events}개 일정",
     }
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
 from datetime import datetime, timedelta
-from typing import List, Optional
-import uuid
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import itertools
+import time
 
+try:  # optional: orjson이 있으면 응답 직렬화를 ORJSONResponse로 처리
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
 
-app = FastAPI(title="Calendar Service (Mock)", version="1.0.0")
+
+app = FastAPI(
+    title="Calendar Service (Mock)",
+    version="1.0.0",
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse,
+)
 
 
 class Event(BaseModel):
@@ -404,20 +416,56 @@ CALENDAR_DATA = {
 }
 
 
-def calculate_free_time(events: List[Event]) -> List[str]:
-    busy_hours = []
+# 목업 서비스라 호스트 간 유일성은 필요 없음 -> uuid4 대신 단조 증가 카운터로 id 발급
+_ID_COUNTER = itertools.count(1)
+
+
+def next_event_id() -> str:
+    return f"evt{next(_ID_COUNTER):06x}"
+
+
+# id -> Event 인덱스 (버킷을 모두 훑지 않고 O(1)로 단건 조회)
+EVENTS_BY_ID: Dict[str, Event] = {e.id: e for events in CALENDAR_DATA.values() for e in events}
+
+
+# 업무 시간(09~18시)의 각 시간대를 비트 하나로 표현합니다. (bit h = h시)
+WORK_HOURS_MASK = ((1 << 18) - 1) & ~((1 << 9) - 1)  # 0x3FE00
+
+
+# "HH:00-HH+1:00" 라벨을 미리 만들어 두고 시간(h)으로 바로 꺼내 씁니다.
+SLOT_LABELS = tuple(f"{h:02d}:00-{h+1:02d}:00" for h in range(24))
+
+
+def busy_mask(events: List[Event]) -> int:
+    """일정 시작 시각들을 비트마스크로 모읍니다. (bit h = h시에 일정 있음)"""
+    busy = 0
     for event in events:
         try:
-            start_hour = int(event.start_time.split(":")[0])
-            if 9 <= start_hour < 18:
-                busy_hours.append(start_hour)
+            busy |= 1 << int(event.start_time.partition(":")[0])
         except Exception:
             continue
+    return busy
+
+
+@lru_cache(maxsize=1 << 9)
+def _free_slots_for_mask(free_mask: int) -> Tuple[str, ...]:
+    # 업무 시간 비트는 9개뿐이라 가능한 마스크가 512가지 -> 결과를 통째로 메모이즈
     free_slots = []
-    for hour in range(9, 18):
-        if hour not in busy_hours:
-            free_slots.append(f"{hour:02d}:00-{hour+1:02d}:00")
-    return free_slots
+    while free_mask:
+        low = free_mask & -free_mask  # 가장 낮은 빈 시간대 비트
+        free_slots.append(SLOT_LABELS[low.bit_length() - 1])
+        free_mask ^= low
+    return tuple(free_slots)
+
+
+def calculate_free_time(events: List[Event]) -> List[str]:
+    # 바쁜 시간대를 정수 비트마스크로 모은 뒤, 비어 있는 비트만 낮은 시간부터 꺼냅니다.
+    return list(_free_slots_for_mask(~busy_mask(events) & WORK_HOURS_MASK))
+
+
+def calculate_free_time_batch(days: List[List[Event]]) -> List[List[str]]:
+    """여러 날의 빈 시간을 한 번에 계산합니다. 날마다 마스크 1개 + 캐시 조회 1번."""
+    return [list(_free_slots_for_mask(~busy_mask(events) & WORK_HOURS_MASK)) for events in days]
 
 
 @app.get("/")
@@ -425,24 +473,65 @@ async def root():
     return {"service": "calendar-service", "status": "running"}
 
 
+def json_response(model: BaseModel) -> Response:
+    """
+    모델을 pydantic-core(Rust)로 바로 직렬화해 반환합니다.
+    response_model 재검증 + jsonable_encoder 단계를 건너뜁니다. (response_model은 문서용으로 유지)
+    """
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
+
+_SCHEDULE_LIST = TypeAdapter(List[DaySchedule])
+
+
+# 직렬화된 DaySchedule 캐시: "{bucket}:{date}" -> (일정 개수, JSON bytes)
+# 일정은 create_event로만 바뀌므로, 그때 비우고 평소에는 Pydantic 검증/직렬화를 건너뜁니다.
+_DAY_CACHE: Dict[str, Tuple[int, bytes]] = {}
+
+
+def day_schedule_response(bucket: str, date_str: str) -> Response:
+    events = CALENDAR_DATA.get(bucket, [])
+    key = f"{bucket}:{date_str}"
+    cached = _DAY_CACHE.get(key)
+    if cached is None or cached[0] != len(events):
+        # 내부에서 만든 값이므로 검증 없이 조립(model_construct)
+        schedule = DaySchedule.model_construct(date=date_str, events=events, total_events=len(events), free_time_slots=calculate_free_time(events))
+        cached = _DAY_CACHE[key] = (len(events), schedule.model_dump_json().encode())
+    return Response(content=cached[1], media_type="application/json")
+
+
+@lru_cache(maxsize=4)
+def _format_date(minute: int, days: int) -> str:
+    return (datetime.fromtimestamp(minute * 60) + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def today_str(days: int = 0) -> str:
+    """오늘(+days) 날짜 문자열. strftime은 분 단위로 한 번만 계산합니다."""
+    return _format_date(int(time.time()) // 60, days)
+
+
 @app.get("/calendar/today", response_model=DaySchedule)
 async def get_today_schedule():
-    today = datetime.now().strftime("%Y-%m-%d")
-    events = CALENDAR_DATA.get("today", [])
-    return DaySchedule(date=today, events=events, total_events=len(events), free_time_slots=calculate_free_time(events))
+    return day_schedule_response("today", today_str())
 
 
 @app.get("/calendar/tomorrow", response_model=DaySchedule)
 async def get_tomorrow_schedule():
-    tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
-    events = CALENDAR_DATA.get("tomorrow", [])
-    return DaySchedule(date=tomorrow, events=events, total_events=len(events), free_time_slots=calculate_free_time(events))
+    return day_schedule_response("tomorrow", today_str(1))
+
+
+@app.get("/calendar/events/{event_id}", response_model=Event)
+async def get_event(event_id: str):
+    e = EVENTS_BY_ID.get(event_id)
+    if e is None:
+        raise HTTPException(status_code=404, detail="이벤트를 찾을 수 없습니다")
+    return json_response(e)
 
 
 @app.post("/calendar/events", response_model=Event)
 async def create_event(event_data: EventCreate):
     new_event = Event(
-        id=str(uuid.uuid4())[:8],
+        id=next_event_id(),
         title=event_data.title,
         start_time=event_data.start_time,
         end_time=event_data.end_time,
@@ -453,7 +542,31 @@ async def create_event(event_data: EventCreate):
         created_at=datetime.now().isoformat(),
     )
     CALENDAR_DATA.setdefault("today", []).append(new_event)
-    return new_event
+    EVENTS_BY_ID[new_event.id] = new_event
+    for key in [k for k in _DAY_CACHE if k.startswith("today:")]:
+        del _DAY_CACHE[key]
+    return json_response(new_event)
+
+
+@app.get("/calendar/range", response_model=List[DaySchedule])
+async def get_range_schedule(start: Optional[str] = None, days: int = 7):
+    """start(YYYY-MM-DD, 기본 오늘)부터 days일 동안의 일정/빈 시간."""
+    if not 1 <= days <= 31:
+        raise HTTPException(status_code=400, detail="days는 1~31 사이여야 합니다")
+    try:
+        first = datetime.strptime(start, "%Y-%m-%d") if start else datetime.strptime(today_str(), "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start는 YYYY-MM-DD 형식이어야 합니다")
+
+    # 목업 데이터는 "today"/"tomorrow" 버킷 + 날짜 키를 함께 사용
+    buckets = {today_str(): "today", today_str(1): "tomorrow"}
+    dates = [(first + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+    per_day = [CALENDAR_DATA.get(buckets.get(d, d), []) for d in dates]
+    schedules = [
+        DaySchedule.model_construct(date=d, events=events, total_events=len(events), free_time_slots=slots)
+        for d, events, slots in zip(dates, per_day, calculate_free_time_batch(per_day))
+    ]
+    return Response(content=_SCHEDULE_LIST.dump_json(schedules), media_type="application/json")
 
 
 @app.get("/calendar/summary")
@@ -7,15 +7,56 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, asdict
-from collections import deque
+from dataclasses import dataclass, field
+from collections import OrderedDict, deque
 from datetime import datetime
-from typing import Any, Deque, Dict, List, Optional
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+import heapq
+import secrets
+import sys
 import threading
 import time
-import uuid
 import json
 
+try:  # optional: orjson (캐시 키 직렬화 가속) - 없으면 표준 json
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:  # optional: xxhash - 긴 인자 JSON 대신 64비트 해시로 캐시 키를 짧게 유지
+    import xxhash
+except ImportError:  # pragma: no cover
+    xxhash = None
+
+# 락 안에서 다른 락 메서드를 다시 부르지 않으므로 재진입 락이 필요 없습니다.
+# fastrlock이 있으면 C 구현 락(가장 빠름), 없으면 threading.Lock을 씁니다.
+try:  # optional: fastrlock
+    from fastrlock.rlock import FastRLock as _Lock
+except ImportError:  # pragma: no cover
+    from threading import Lock as _Lock
+
+
+# 턴마다 같은 intent 문자열/apis 리스트를 따로 들고 있지 않도록 하나의 객체를 공유합니다.
+_INTENT_INTERN: Dict[str, str] = {
+    s: sys.intern(s)
+    for s in (
+        "chat", "help", "weather_query", "calendar_query", "calendar_create",
+        "file_search", "notification_send", "agentic",
+    )
+}
+_APIS_INTERN: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+_APIS_INTERN_MAX = 256  # 도구 이름 조합은 몇 개 안 되지만 혹시 모를 폭증에 대비한 상한
+
+
+def _intern_apis(apis: Optional[List[str]]) -> Tuple[str, ...]:
+    key = tuple(apis or ())
+    shared = _APIS_INTERN.get(key)
+    if shared is not None:
+        return shared
+    if len(_APIS_INTERN) < _APIS_INTERN_MAX:
+        _APIS_INTERN[key] = key
+    return key
+
 
 @dataclass
 class ConversationTurn:
@@ -24,7 +65,7 @@ class ConversationTurn:
     assistant_response: str
     intent: str
     confidence: float
-    apis_used: List[str]
+    apis_used: Tuple[str, ...]  # _intern_apis로 공유되는 불변 튜플
     success: bool
     timestamp: str
     processing_time: float
@@ -41,58 +82,101 @@ class SessionContext:
     user_preferences: Dict[str, Any]
     active_topics: List[str]
     session_metadata: Dict[str, Any] | None = None
+    # 마지막 활동 시각(epoch 초). 만료 검사는 이 값만 비교하고,
+    # ISO 문자열(last_activity)은 export_session에서 필요할 때 다시 만듭니다.
+    last_activity_ts: float = field(default_factory=time.time)
+    # 최근 N턴 윈도우 (maxlen은 ContextManager가 등록 시 설정). 세션과 한 객체에 두어 dict 조회를 한 번으로 줄입니다.
+    recent_turns: Deque[ConversationTurn] = field(default_factory=deque, init=False, repr=False)
 
 
 class ContextManager:
-    def __init__(self, max_history_length: int = 20, session_timeout_hours: int = 24):
+    def __init__(
+        self,
+        max_history_length: int = 20,
+        session_timeout_hours: int = 24,
+        max_tool_cache_entries: int = 128,
+        tool_cache_max_age_seconds: float = 3600,
+    ):
         self.max_history_length = max_history_length
         self.session_timeout_hours = session_timeout_hours
+        # 세션별 툴 캐시 상한 (LRU로 밀어냄) / 어떤 TTL로 조회해도 쓰이지 않을 만큼 오래된 항목의 기준
+        self.max_tool_cache_entries = max_tool_cache_entries
+        self.tool_cache_max_age_seconds = tool_cache_max_age_seconds
 
         self.active_sessions: Dict[str, SessionContext] = {}
-        self.context_windows: Dict[str, Deque[ConversationTurn]] = {}
 
-        self._lock = threading.RLock()
+        self._lock = _Lock()
+        # 만료 예정 시각 min-heap: (expires_at, session_id). 세션당 항목은 최대 1개.
+        # 활동이 갱신돼도 heap은 건드리지 않고, 꺼낼 때 실제 만료 시각을 확인해 다시 넣습니다(lazy).
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._scheduled: Set[str] = set()
+        self._wakeup = threading.Event()
+        self._shutdown = threading.Event()
         self._cleanup_thread: Optional[threading.Thread] = None
         self._start_cleanup_service()
 
     def _start_cleanup_service(self) -> None:
         def worker():
-            while True:
-                time.sleep(3600)
+            while not self._shutdown.is_set():
+                # 가장 이른 만료 시각까지만 잠들었다가, 만료된 세션만 정리합니다.
                 try:
-                    self.cleanup_expired_sessions()
+                    delay = self.cleanup_expired_sessions()
                 except Exception:
-                    pass
+                    delay = None
+                self._wakeup.wait(timeout=3600 if delay is None else min(delay, 3600))
+                self._wakeup.clear()
 
-        self._cleanup_thread = threading.Thread(target=worker, daemon=True)
+        self._cleanup_thread = threading.Thread(target=worker, name="session-cleanup", daemon=True)
         self._cleanup_thread.start()
 
+    def shutdown(self, timeout: Optional[float] = 5.0) -> None:
+        """정리 스레드를 즉시 깨워 종료시킵니다. (여러 번 호출해도 안전)"""
+        self._shutdown.set()
+        self._wakeup.set()
+        thread = self._cleanup_thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def _add_session_nolock(self, session: SessionContext) -> SessionContext:
+        """세션을 등록하고 만료 스케줄에 올립니다. (호출자가 self._lock을 잡고 있어야 함)"""
+        sid = session.session_id
+        self.active_sessions[sid] = session
+        session.recent_turns = deque(maxlen=self.max_history_length)
+        if sid not in self._scheduled:
+            self._scheduled.add(sid)
+            heapq.heappush(self._expiry_heap, (session.last_activity_ts + self.session_timeout_hours * 3600, sid))
+            if self._expiry_heap[0][1] == sid:
+                self._wakeup.set()  # 새 항목이 가장 먼저 만료되면 대기 중인 정리 스레드를 깨움
+        return session
+
     def create_session(self, user_id: Optional[str] = None, session_metadata: Optional[Dict[str, Any]] = None) -> str:
+        now = datetime.now().isoformat()
+        # strftime/uuid4 대신 epoch 초 + 난수 hex (락 밖에서 생성)
+        session_id = f"session_{int(time.time())}_{secrets.token_hex(4)}"
         with self._lock:
-            session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
-            now = datetime.now().isoformat()
-            session = SessionContext(
-                session_id=session_id,
-                user_id=user_id,
-                created_at=now,
-                last_activity=now,
-                conversation_turns=[],
-                user_preferences={},
-                active_topics=[],
-                session_metadata=session_metadata or {},
+            self._add_session_nolock(
+                SessionContext(
+                    session_id=session_id,
+                    user_id=user_id,
+                    created_at=now,
+                    last_activity=now,
+                    conversation_turns=[],
+                    user_preferences={},
+                    active_topics=[],
+                    session_metadata=session_metadata or {},
+                )
             )
-            self.active_sessions[session_id] = session
-            self.context_windows[session_id] = deque(maxlen=self.max_history_length)
             return session_id
 
     def get_session(self, session_id: str) -> Optional[SessionContext]:
-        with self._lock:
-            return self.active_sessions.get(session_id)
+        # dict.get 한 번은 GIL 아래에서 원자적이라 락 없이 조회합니다.
+        # (반환된 세션의 가변 필드를 읽을 때는 호출자가 복사하거나 락을 잡아야 함)
+        return self.active_sessions.get(session_id)
 
     def update_session_activity(self, session_id: str) -> None:
         with self._lock:
             if session_id in self.active_sessions:
-                self.active_sessions[session_id].last_activity = datetime.now().isoformat()
+                self.active_sessions[session_id].last_activity_ts = time.time()
 
     def add_conversation_turn(
         self,
@@ -106,125 +190,193 @@ class ContextManager:
         processing_time: float,
         metadata: Optional[Dict[str, Any]] = None,
     ) -> str:
+        now = datetime.now().isoformat()  # 이 턴에서 쓰는 타임스탬프는 한 번만 만듭니다.
         with self._lock:
             if session_id not in self.active_sessions:
-                self.active_sessions[session_id] = SessionContext(
-                    session_id=session_id,
-                    user_id=None,
-                    created_at=datetime.now().isoformat(),
-                    last_activity=datetime.now().isoformat(),
-                    conversation_turns=[],
-                    user_preferences={},
-                    active_topics=[],
-                    session_metadata={},
+                self._add_session_nolock(
+                    SessionContext(
+                        session_id=session_id,
+                        user_id=None,
+                        created_at=now,
+                        last_activity=now,
+                        conversation_turns=[],
+                        user_preferences={},
+                        active_topics=[],
+                        session_metadata={},
+                    )
                 )
-                self.context_windows[session_id] = deque(maxlen=self.max_history_length)
 
             session = self.active_sessions[session_id]
-            turn_id = f"turn_{len(session.conversation_turns)}_{uuid.uuid4().hex[:6]}"
+            turn_id = f"turn_{len(session.conversation_turns)}_{secrets.token_hex(3)}"
             turn = ConversationTurn(
                 turn_id=turn_id,
                 user_input=user_input,
                 assistant_response=assistant_response,
-                intent=intent,
+                intent=_INTENT_INTERN.get(intent, intent),
                 confidence=confidence,
-                apis_used=apis_used,
+                apis_used=_intern_apis(apis_used),
                 success=success,
-                timestamp=datetime.now().isoformat(),
+                timestamp=now,
                 processing_time=processing_time,
                 metadata=metadata or {},
             )
             session.conversation_turns.append(turn)
-            self.context_windows[session_id].append(turn)
-            self.update_session_activity(session_id)
+            session.recent_turns.append(turn)
+            session.last_activity_ts = time.time()
             return turn_id
 
     def get_recent_turns(self, session_id: str, n: int = 5) -> List[Dict[str, Any]]:
         with self._lock:
-            window = list(self.context_windows.get(session_id, deque()))
-            turns = window[-n:]
-            return [
-                {
-                    "user_input": t.user_input,
-                    "assistant_response": t.assistant_response,
-                    "intent": t.intent,
-                    "success": t.success,
-                    "timestamp": t.timestamp,
-                }
-                for t in turns
-            ]
+            session = self.active_sessions.get(session_id)
+            dq = session.recent_turns if session is not None else None
+            if not dq or n <= 0:
+                return []
+            # 윈도우 전체를 list로 복사하지 않고 뒤쪽 n개만 꺼냅니다. (deque는 양끝 인덱싱이 O(1))
+            size = len(dq)
+            turns = [dq[i] for i in range(size - min(n, size), size)]
+        # 턴 객체는 추가된 뒤 바뀌지 않으므로 dict 변환은 락 밖에서 합니다.
+        return [
+            {
+                "user_input": t.user_input,
+                "assistant_response": t.assistant_response,
+                "intent": t.intent,
+                "success": t.success,
+                "timestamp": t.timestamp,
+            }
+            for t in turns
+        ]
 
     def export_session(self, session_id: str) -> Dict[str, Any]:
         with self._lock:
             session = self.active_sessions.get(session_id)
-            return asdict(session) if session else {}
+            if not session:
+                return {}
+            # asdict()는 모든 필드를 재귀적으로 deepcopy하므로, 얕은 dict를 직접 만듭니다.
+            # (중첩 값은 세션과 참조를 공유하므로 호출자는 읽기 전용으로 다뤄야 함)
+            return {
+                "session_id": session.session_id,
+                "user_id": session.user_id,
+                "created_at": session.created_at,
+                "last_activity": datetime.fromtimestamp(session.last_activity_ts).isoformat(),
+                "conversation_turns": [dict(vars(t)) for t in session.conversation_turns],
+                "user_preferences": dict(session.user_preferences),
+                "active_topics": list(session.active_topics),
+                "session_metadata": dict(session.session_metadata or {}),
+            }
 
     # ---- Tool-result cache (session-scoped) ----
-    def _ensure_tool_cache(self, session_id: str) -> Dict[str, Any]:
+    def _ensure_tool_cache_nolock(self, session_id: str) -> Dict[str, Any]:
         """
-        Session-scoped cache for tool results.
-        Structure: session.session_metadata["tool_cache"][cache_key] = {"ts": float, "value": Any}
+        Session-scoped cache for tool results. (호출자가 self._lock을 잡고 있어야 함)
+        Structure: session.session_metadata["tool_cache"][cache_key] = (ts: float, value: Any)
         """
-        with self._lock:
-            session = self.active_sessions.get(session_id)
-            if not session:
-                # create minimal session if missing
-                self.active_sessions[session_id] = SessionContext(
+        session = self.active_sessions.get(session_id)
+        if not session:
+            # create minimal session if missing
+            now = datetime.now().isoformat()
+            session = self._add_session_nolock(
+                SessionContext(
                     session_id=session_id,
                     user_id=None,
-                    created_at=datetime.now().isoformat(),
-                    last_activity=datetime.now().isoformat(),
+                    created_at=now,
+                    last_activity=now,
                     conversation_turns=[],
                     user_preferences={},
                     active_topics=[],
                     session_metadata={},
                 )
-                self.context_windows[session_id] = deque(maxlen=self.max_history_length)
-                session = self.active_sessions[session_id]
-
-            session.session_metadata = session.session_metadata or {}
-            tool_cache = session.session_metadata.get("tool_cache")
-            if not isinstance(tool_cache, dict):
-                tool_cache = {}
-                session.session_metadata["tool_cache"] = tool_cache
-            return tool_cache
+            )
 
-    def make_cache_key(self, tool_name: str, args: Dict[str, Any]) -> str:
+        session.session_metadata = session.session_metadata or {}
+        tool_cache = session.session_metadata.get("tool_cache")
+        if not isinstance(tool_cache, OrderedDict):
+            # 앞쪽 = 가장 오래 안 쓴 항목 (LRU)
+            tool_cache = OrderedDict(
+                (k, (v.get("ts"), v.get("value")))
+                for k, v in (tool_cache.items() if isinstance(tool_cache, dict) else ())
+                if isinstance(v, dict)
+            )
+            session.session_metadata["tool_cache"] = tool_cache
+        return tool_cache
+
+    @staticmethod
+    def _args_blob(args: Dict[str, Any]) -> bytes:
+        """인자 dict의 정규화된(키 정렬) JSON 바이트."""
+        if orjson is not None:
+            try:
+                return orjson.dumps(args or {}, option=orjson.OPT_SORT_KEYS)
+            except TypeError:  # 문자열이 아닌 키 등 orjson이 못 다루는 값은 아래 json 경로로
+                pass
         try:
             args_s = json.dumps(args or {}, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
         except Exception:
             args_s = str(args)
-        return f"{tool_name}:{args_s}"
+        return args_s.encode()
+
+    def make_cache_key(self, tool_name: str, args: Dict[str, Any]) -> str:
+        blob = self._args_blob(args)
+        if xxhash is not None:
+            # 인자 크기와 무관하게 "tool:16자리 hex" 고정 길이 키 (64비트 충돌 확률은 무시 가능)
+            return f"{tool_name}:{xxhash.xxh3_64_hexdigest(blob)}"
+        return f"{tool_name}:{blob.decode()}"
 
     def get_cached_tool_result(self, session_id: str, cache_key: str, ttl_seconds: Optional[float] = None) -> Optional[Any]:
-        with self._lock:
-            tool_cache = self._ensure_tool_cache(session_id)
-            entry = tool_cache.get(cache_key)
-            if not isinstance(entry, dict):
-                return None
-            ts = entry.get("ts")
-            if not isinstance(ts, (int, float)):
-                return None
-            if ttl_seconds is not None and (time.time() - float(ts)) > float(ttl_seconds):
-                return None
-            return entry.get("value")
+        # 락 없는 읽기: 항목은 교체만 되고 수정되지 않는 (ts, value) 튜플이라 dict.get 한 번으로 일관된 스냅샷을 얻습니다.
+        session = self.active_sessions.get(session_id)
+        tool_cache = session.session_metadata.get("tool_cache") if session and session.session_metadata else None
+        if not isinstance(tool_cache, OrderedDict):
+            return None  # 캐시가 아직 없으면 miss (set_cached_tool_result에서 생성)
+        entry = tool_cache.get(cache_key)
+        if not isinstance(entry, tuple):
+            return None
+        ts, value = entry
+        if not isinstance(ts, (int, float)):
+            return None
+        if ttl_seconds is not None and (time.time() - float(ts)) > float(ttl_seconds):
+            return None
+        try:
+            tool_cache.move_to_end(cache_key)  # LRU 갱신 (C 구현이라 GIL 아래 원자적)
+        except KeyError:  # 그 사이 다른 스레드가 축출함 - 값은 이미 확보했으므로 그대로 반환
+            pass
+        return value
 
     def set_cached_tool_result(self, session_id: str, cache_key: str, value: Any) -> None:
         with self._lock:
-            tool_cache = self._ensure_tool_cache(session_id)
-            tool_cache[cache_key] = {"ts": time.time(), "value": value}
-
-    def cleanup_expired_sessions(self) -> None:
+            tool_cache = self._ensure_tool_cache_nolock(session_id)
+            now = time.time()
+            # 너무 오래된 항목은 앞에서부터 정리하고, 그래도 가득 차 있으면 LRU 항목을 버립니다.
+            while tool_cache:
+                oldest_ts = next(iter(tool_cache.values()))[0]
+                if now - float(oldest_ts or 0) <= self.tool_cache_max_age_seconds:
+                    break
+                tool_cache.popitem(last=False)
+            tool_cache[cache_key] = (now, value)
+            tool_cache.move_to_end(cache_key)
+            while len(tool_cache) > self.max_tool_cache_entries:
+                tool_cache.popitem(last=False)
+
+    def cleanup_expired_sessions(self) -> Optional[float]:
+        """
+        만료 시각이 지난 heap 항목만 꺼내 정리합니다. (전체 세션을 훑지 않음)
+        Returns: 다음 만료까지 남은 초 (예정된 세션이 없으면 None)
+        """
+        timeout_s = self.session_timeout_hours * 3600
+        heap = self._expiry_heap
         with self._lock:
-            now = datetime.now()
-            expired: List[str] = []
-            for sid, session in self.active_sessions.items():
-                last = datetime.fromisoformat(session.last_activity)
-                if (now - last).total_seconds() > (self.session_timeout_hours * 3600):
-                    expired.append(sid)
-            for sid in expired:
+            now = time.time()
+            while heap and heap[0][0] <= now:
+                _, sid = heapq.heappop(heap)
+                session = self.active_sessions.get(sid)
+                if session is None:  # 이미 제거된 세션
+                    self._scheduled.discard(sid)
+                    continue
+                expires_at = session.last_activity_ts + timeout_s
+                if expires_at > now:  # 그 사이 활동이 있었음 -> 실제 만료 시각으로 다시 예약
+                    heapq.heappush(heap, (expires_at, sid))
+                    continue
+                self._scheduled.discard(sid)
                 self.active_sessions.pop(sid, None)
-                self.context_windows.pop(sid, None)
+            return (heap[0][0] - now) if heap else None
 
 
 context_manager = ContextManager()
@@ -235,17 +387,20 @@ def get_or_create_session(session_id: Optional[str] = None, user_id: Optional[st
         context_manager.update_session_activity(session_id)
         return session_id
     if session_id and not context_manager.get_session(session_id):
-        context_manager.active_sessions[session_id] = SessionContext(
-            session_id=session_id,
-            user_id=user_id,
-            created_at=datetime.now().isoformat(),
-            last_activity=datetime.now().isoformat(),
-            conversation_turns=[],
-            user_preferences={},
-            active_topics=[],
-            session_metadata={},
-        )
-        context_manager.context_windows[session_id] = deque(maxlen=context_manager.max_history_length)
+        now = datetime.now().isoformat()
+        with context_manager._lock:
+            context_manager._add_session_nolock(
+                SessionContext(
+                    session_id=session_id,
+                    user_id=user_id,
+                    created_at=now,
+                    last_activity=now,
+                    conversation_turns=[],
+                    user_preferences={},
+                    active_topics=[],
+                    session_metadata={},
+                )
+            )
         return session_id
     return context_manager.create_session(user_id=user_id)
 
@@ -9,98 +9,273 @@
 
 from __future__ import annotations
 
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+import re
+import threading
+
+
+try:  # optional: pyahocorasick (C 확장) - 없으면 정규식으로 동작
+    import ahocorasick
+except ImportError:  # pragma: no cover
+    ahocorasick = None
+
+
+# 키워드 기반 fallback 분류 테이블.
+# - dict 순서 = 우선순위 (여러 의도가 함께 매칭되면 앞선 의도가 이김)
+_INTENT_KEYWORDS: Dict[str, tuple] = {
+    "weather_query": ("날씨", "기온", "비", "눈", "우산"),
+    "calendar": ("일정", "회의", "미팅", "스케줄"),
+    "file_search": ("파일", "문서", "자료", "명세", "회의록"),
+    "notification_send": ("알림", "공지", "보내", "전송", "슬랙", "이메일", "sms", "문자"),
+    "help": ("도움말", "뭐 할 수", "할 수 있어"),
+}
+_INTENT_PRIORITY = tuple(_INTENT_KEYWORDS)
+_CREATE_KEYWORDS = ("잡아", "생성", "추가", "만들")
+
+# 복합 요청(…해서 팀에게 알려줘) 감지용 키워드 그룹
+_NOTIFY_KEYWORDS: Dict[str, frozenset] = {
+    "verb": frozenset(("알려", "공유", "전달", "공지", "보내", "전송")),  # "알려줘", "공유해줘", "전달해줘" 패턴
+    "recipient": frozenset(("팀", "팀원", "동료", "사람들", "전체", "전원", "모두")),
+    "channel": frozenset(("슬랙", "slack", "이메일", "email", "sms", "문자", "메일")),
+}
+
+# 입력 문자열을 한 번만 스캔해서 매칭된 의도 그룹들을 모읍니다.
+_INTENT_RE = re.compile(
+    "|".join(f"(?P<{intent}>{'|'.join(map(re.escape, kws))})" for intent, kws in _INTENT_KEYWORDS.items())
+)
+_CREATE_RE = re.compile("|".join(map(re.escape, _CREATE_KEYWORDS)))
+# verb/recipient/channel 세 그룹을 한 번의 finditer로 판정 (긴 키워드 우선)
+_NOTIFY_RE = re.compile(
+    "|".join(
+        f"(?P<{group}>{'|'.join(map(re.escape, sorted(kws, key=len, reverse=True)))})"
+        for group, kws in _NOTIFY_KEYWORDS.items()
+    )
+)
+
+
+def _build_automaton(pairs):
+    ac = ahocorasick.Automaton()
+    for keyword, tag in pairs:
+        ac.add_word(keyword, tag)
+    ac.make_automaton()
+    return ac
+
+
+# 키워드가 수백 개로 늘어나도 O(len(s) + matches) 한 번의 스캔으로 끝나는 Aho-Corasick 오토마톤
+_INTENT_AC = _build_automaton((k, intent) for intent, kws in _INTENT_KEYWORDS.items() for k in kws) if ahocorasick else None
+_CREATE_AC = _build_automaton((k, "create") for k in _CREATE_KEYWORDS) if ahocorasick else None
+_NOTIFY_AC = _build_automaton((k, group) for group, kws in _NOTIFY_KEYWORDS.items() for k in kws) if ahocorasick else None
+
+
+def _keyword_hits(s: str) -> set:
+    """입력에서 매칭된 의도 태그 집합."""
+    if _INTENT_AC is not None:
+        return {tag for _, tag in _INTENT_AC.iter(s)}
+    return {m.lastgroup for m in _INTENT_RE.finditer(s)}
+
+
+def has_create_verb(s: str) -> bool:
+    if _CREATE_AC is not None:
+        return next(_CREATE_AC.iter(s), None) is not None
+    return _CREATE_RE.search(s) is not None
+
+
+def _notify_hits(s: str) -> set:
+    """입력에서 매칭된 알림 키워드 그룹(verb/recipient/channel) 집합."""
+    if _NOTIFY_AC is not None:
+        return {group for _, group in _NOTIFY_AC.iter(s)}
+    return {m.lastgroup for m in _NOTIFY_RE.finditer(s)}
+
+
+def keyword_intent(s: str) -> Optional[str]:
+    """
+    소문자 입력에서 우선순위가 가장 높은 키워드 의도를 돌려줍니다.
+    (weather_query | calendar | file_search | notification_send | help | None)
+    """
+    hits = _keyword_hits(s)
+    return next((k for k in _INTENT_PRIORITY if k in hits), None)
+
+
+def _wants_notification(s: str) -> bool:
+    """복합 요청에서 알림 의도 감지 (s는 소문자로 정규화된 입력)"""
+    hits = _notify_hits(s)
+    return "verb" in hits or "channel" in hits or ("recipient" in hits and "에게" in s)
+
+
+@lru_cache(maxsize=2048)
+def _classify(norm: str) -> Tuple[str, Tuple[str, ...], float]:
+    """키워드 기반 분류 (순수 함수) -> (intent, apis, confidence).
+
+    입력에만 의존하므로 정규화된 문자열을 키로 메모이즈합니다.
+    반복되는 질문은 키워드 스캔 없이 바로 결과를 돌려받습니다.
+    """
+    apis: Tuple[str, ...] = ()
+    intent = "chat"
+    confidence = 0.6  # 키워드 기반은 낮은 신뢰도
+
+    kind = keyword_intent(norm)
+
+    if kind == "weather_query":
+        intent = "weather_query"
+        apis = ("weather",)
+    elif kind == "calendar":
+        intent = "calendar_create" if has_create_verb(norm) else "calendar_query"
+        apis = ("calendar",)
+    elif kind == "file_search":
+        intent = "file_search"
+        apis = ("file",)
+    elif kind == "notification_send":
+        intent = "notification_send"
+        apis = ("notification",)
+    elif kind == "help":
+        intent = "help"
+        confidence = 0.9
+
+    # 복합 요청 감지
+    if intent in ("weather_query", "calendar_query", "calendar_create", "file_search"):
+        if _wants_notification(norm):
+            apis += ("notification",)
+
+    return intent, apis, confidence
+
+
+# LLM 분류 결과 캐시: (프롬프트 버전, 정규화된 입력) -> primary intent
+# IntentClassifier는 요청마다 새로 만들어지므로 모듈 수준에 둡니다.
+# 프롬프트(few-shot 예시 등)를 고치면 _PROMPT_VERSION을 올리거나 clear_intent_cache()를 호출하세요.
+_PROMPT_VERSION = "v1"
+_LLM_INTENT_CACHE_SIZE = 1024
+_llm_intent_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+_llm_intent_lock = threading.Lock()
+
+
+def _cached_llm_intent(norm: str) -> Optional[str]:
+    key = (_PROMPT_VERSION, norm)
+    with _llm_intent_lock:
+        intent = _llm_intent_cache.get(key)
+        if intent is not None:
+            _llm_intent_cache.move_to_end(key)
+        return intent
+
+
+def _store_llm_intent(norm: str, intent: str) -> None:
+    key = (_PROMPT_VERSION, norm)
+    with _llm_intent_lock:
+        _llm_intent_cache[key] = intent
+        _llm_intent_cache.move_to_end(key)
+        while len(_llm_intent_cache) > _LLM_INTENT_CACHE_SIZE:
+            _llm_intent_cache.popitem(last=False)
+
+
+def clear_intent_cache() -> None:
+    """의도 분류 캐시(LLM/키워드)를 모두 비웁니다."""
+    with _llm_intent_lock:
+        _llm_intent_cache.clear()
+    _classify.cache_clear()
+
+
+# LLM 응답 파싱: 유효 intent 이름(우선순위 순)과 부분 매칭 힌트를 각각 한 번의 스캔으로 찾습니다.
+_LLM_INTENTS = (
+    "weather_query", "calendar_query", "calendar_create",
+    "file_search", "notification_send", "help", "chat",
+)
+_LLM_INTENT_RE = re.compile("|".join(_LLM_INTENTS))
+_LLM_HINT_RE = re.compile(
+    r"(?P<weather>weather)|(?P<calendar>calendar)|(?P<file>file|문서)"
+    r"|(?P<notification>notification|알림)|(?P<help>help|도움)"
+)
+_LLM_CREATE_RE = re.compile("create|생성|추가|만들")
+
+# Few-shot prompt for intent classification
+# 고정된 본문은 모듈 상수로 한 번만 만들고, 호출마다 사용자 입력만 이어 붙입니다.
+_PROMPT_PREFIX = """사용자 입력의 의도를 빠르게 분류하세요. (도메인 라우팅용)
+
+분류 기준:
+- weather_query: 날씨 관련 조회
+- calendar_query: 일정 조회  
+- calendar_create: 일정 생성
+- file_search: 문서/파일 검색
+- notification_send: 알림/공지 발송
+- help: 도움말/기능 설명
+- chat: 일반 대화/질문
+
+예시:
+"서울 날씨 어때?" → weather_query
+"오늘 일정 있어?" → calendar_query  
+"3시에 회의 잡아줘" → calendar_create
+"계약서 찾아줘" → file_search
+"팀에게 알려줘" → notification_send
+"뭐 할 수 있어?" → help
+"안녕하세요" → chat
+"우리 회사 매출이 얼마야?" → chat
+"비가 올까?" → weather_query
+"내일 미팅 있나?" → calendar_query
+
+사용자 입력: \""""
+_PROMPT_SUFFIX = """\"
+분류 결과 (intent만 답변): """
 
 
 @dataclass
 class IntentClassifier:
-    llm_chat_fn: Any = None  # callable(prompt:str)->str, injected from orchestrator
+    llm_chat_fn: Any = None  # async callable(prompt:str)->str, injected from orchestrator
     
     def _extract_primary_intent(self, llm_response: str) -> str:
         """LLM 응답에서 의도를 추출 (fallback 처리 포함)"""
         response = str(llm_response or "").strip().lower()
         
-        # 정확한 매칭 우선
-        valid_intents = ["weather_query", "calendar_query", "calendar_create", 
-                        "file_search", "notification_send", "help", "chat"]
-        
-        for intent in valid_intents:
-            if intent in response:
-                return intent
-        
+        # 정확한 매칭 우선 (여러 개가 보이면 _LLM_INTENTS 순서가 이김)
+        hits = set(_LLM_INTENT_RE.findall(response))
+        if hits:
+            return next(i for i in _LLM_INTENTS if i in hits)
+
         # 부분 매칭 fallback
-        if "weather" in response:
+        hints = {m.lastgroup for m in _LLM_HINT_RE.finditer(response)}
+        if "weather" in hints:
             return "weather_query"
-        elif "calendar" in response:
-            if any(k in response for k in ["create", "생성", "추가", "만들"]):
+        elif "calendar" in hints:
+            if _LLM_CREATE_RE.search(response):
                 return "calendar_create"
             return "calendar_query"
-        elif "file" in response or "문서" in response:
+        elif "file" in hints:
             return "file_search"
-        elif "notification" in response or "알림" in response:
+        elif "notification" in hints:
             return "notification_send"
-        elif "help" in response or "도움" in response:
+        elif "help" in hints:
             return "help"
         
         return "chat"  # 기본값
     
     def _detect_notification_intent(self, user_input: str) -> bool:
         """복합 요청에서 알림 의도 감지"""
-        s = user_input.lower()
-        
-        # "알려줘", "공유해줘", "전달해줘" 패턴
-        notification_patterns = ["알려", "공유", "전달", "공지", "보내", "전송"]
-        recipients = ["팀", "팀원", "동료", "사람들", "전체", "전원", "모두"]
-        channels = ["슬랙", "slack", "이메일", "email", "sms", "문자", "메일"]
-        
-        has_notification_verb = any(pattern in s for pattern in notification_patterns)
-        has_recipient = any(recipient in s for recipient in recipients)
-        has_channel = any(channel in s for channel in channels)
-        
-        return has_notification_verb or has_channel or (has_recipient and "에게" in s)
+        return _wants_notification(user_input.lower())
 
-    def analyze_intent(self, user_input: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    async def analyze_intent(self, user_input: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Few-shot LLM 기반 의도 분류"""
         
         # LLM이 비활성화된 경우 키워드 기반 fallback
         if not self.llm_chat_fn:
             return self._fallback_keyword_analysis(user_input)
         
-        # Few-shot prompt for intent classification
-        prompt = f"""사용자 입력의 의도를 빠르게 분류하세요. (도메인 라우팅용)
-
-분류 기준:
-- weather_query: 날씨 관련 조회
-- calendar_query: 일정 조회  
-- calendar_create: 일정 생성
-- file_search: 문서/파일 검색
-- notification_send: 알림/공지 발송
-- help: 도움말/기능 설명
-- chat: 일반 대화/질문
-
-예시:
-"서울 날씨 어때?" → weather_query
-"오늘 일정 있어?" → calendar_query  
-"3시에 회의 잡아줘" → calendar_create
-"계약서 찾아줘" → file_search
-"팀에게 알려줘" → notification_send
-"뭐 할 수 있어?" → help
-"안녕하세요" → chat
-"우리 회사 매출이 얼마야?" → chat
-"비가 올까?" → weather_query
-"내일 미팅 있나?" → calendar_query
+        norm = user_input.strip().lower()
+        primary_intent = _cached_llm_intent(norm)
+        if primary_intent is None:
+            try:
+                primary_intent = await self._llm_primary_intent(user_input)
+            except Exception:
+                # LLM 실패 시 키워드 기반 fallback (실패 결과는 캐시하지 않음)
+                return self._fallback_keyword_analysis(user_input)
+            _store_llm_intent(norm, primary_intent)
+        return self._build_llm_result(user_input, primary_intent)
 
-사용자 입력: "{user_input}"
-분류 결과 (intent만 답변): """
+    async def _llm_primary_intent(self, user_input: str) -> str:
+        """LLM 한 번 호출로 primary intent를 얻습니다."""
+        prompt = _PROMPT_PREFIX + user_input + _PROMPT_SUFFIX
+        return self._extract_primary_intent(await self.llm_chat_fn(prompt))
 
-        try:
-            llm_response = self.llm_chat_fn(prompt)
-            primary_intent = self._extract_primary_intent(llm_response)
-        except Exception:
-            # LLM 실패 시 키워드 기반 fallback
-            return self._fallback_keyword_analysis(user_input)
-        
+    def _build_llm_result(self, user_input: str, primary_intent: str) -> Dict[str, Any]:
         # API 매핑
         apis = []
         if primary_intent == "weather_query":
@@ -137,41 +312,11 @@ class IntentClassifier:
     
     def _fallback_keyword_analysis(self, user_input: str) -> Dict[str, Any]:
         """LLM 비활성화 시 키워드 기반 fallback"""
-        s = user_input.lower()
-        
-        apis = []
-        intent = "chat"
-        confidence = 0.6  # 키워드 기반은 낮은 신뢰도
-        
-        if any(k in s for k in ["날씨", "기온", "비", "눈", "우산"]):
-            intent = "weather_query"
-            apis = ["weather"]
-        elif any(k in s for k in ["일정", "회의", "미팅", "스케줄"]):
-            if any(k in s for k in ["잡아", "생성", "추가", "만들"]):
-                intent = "calendar_create"
-            else:
-                intent = "calendar_query"
-            apis = ["calendar"]
-        elif any(k in s for k in ["파일", "문서", "자료", "명세", "회의록"]):
-            intent = "file_search"
-            apis = ["file"]
-        elif any(k in s for k in ["알림", "공지", "보내", "전송", "슬랙", "이메일", "sms", "문자"]):
-            intent = "notification_send"
-            apis = ["notification"]
-        elif any(k in s for k in ["도움말", "뭐 할 수", "할 수 있어"]):
-            intent = "help"
-            apis = []
-            confidence = 0.9
-        
-        # 복합 요청 감지
-        if intent in ("weather_query", "calendar_query", "calendar_create", "file_search"):
-            if self._detect_notification_intent(user_input):
-                if "notification" not in apis:
-                    apis.append("notification")
-        
+        intent, apis, confidence = _classify(user_input.strip().lower())
+
         return {
             "intent": intent,
-            "apis": apis,
+            "apis": list(apis),  # 캐시된 튜플을 호출자가 수정하지 않도록 복사
             "confidence": confidence,
             "parameters": {
                 "user_input": user_input,
@@ -179,5 +324,3 @@ class IntentClassifier:
             },
             "reasoning": "키워드 기반 (LLM 비활성화)",
         }
-
-
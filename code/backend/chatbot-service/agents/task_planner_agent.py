@@ -11,69 +11,284 @@ TaskPlannerAgent (LLM 기반).
 
 from __future__ import annotations
 
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
+import copy
 import json
+import re
+import time
 
+try:  # optional: orjson (Rust 기반 JSON 파서) - 없으면 표준 json
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
 
-def _extract_json_object(text: str) -> Dict[str, Any]:
+# orjson.JSONDecodeError와 json.JSONDecodeError는 모두 ValueError의 하위 클래스
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def extract_json_object(text: str) -> Dict[str, Any]:
+    """LLM 응답에서 JSON 객체를 꺼냅니다. (앞뒤 설명 문장이 섞여 있어도 첫 `{`~마지막 `}` 구간을 시도)"""
     if not text:
         return {}
     text = text.strip()
     try:
-        obj = json.loads(text)
-        return obj if isinstance(obj, dict) else {}
-    except Exception:
-        pass
-    try:
+        obj = _loads(text)
+    except (ValueError, TypeError):
         start = text.find("{")
         end = text.rfind("}")
-        if start >= 0 and end > start:
-            obj = json.loads(text[start : end + 1])
-            return obj if isinstance(obj, dict) else {}
-    except Exception:
-        return {}
-    return {}
+        if start < 0 or end <= start:
+            return {}
+        try:
+            obj = _loads(text[start : end + 1])
+        except (ValueError, TypeError):
+            return {}
+    return obj if isinstance(obj, dict) else {}
 
 
-def _safe_str(x: Any, limit: int = 1800) -> str:
-    try:
-        s = json.dumps(x, ensure_ascii=False)
-    except Exception:
-        s = str(x)
+def safe_str(x: Any, limit: int = 1800) -> str:
+    """프롬프트에 넣을 JSON 문자열 (limit 초과 시 잘라냄)"""
+    if orjson is not None:
+        try:
+            b = orjson.dumps(x, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            s = str(x)
+        else:
+            if len(b) <= limit:  # UTF-8 바이트 수 >= 글자 수이므로 그대로 들어감
+                return b.decode()
+            # 잘라낼 앞부분(최대 limit*4 바이트)만 디코드합니다. 끝에서 잘린 멀티바이트 문자는 버림
+            s = b[: limit * 4].decode("utf-8", "ignore")
+    else:
+        try:
+            s = json.dumps(x, ensure_ascii=False)
+        except Exception:
+            s = str(x)
     return s if len(s) <= limit else (s[:limit] + "…")
 
 
+# 숫자와 따옴표로 감싼 값은 요청마다 바뀌는 "변수"로 보고 <VAR>로 치환해 요청의 골격(skeleton)을 만듭니다.
+_VAR_RE = re.compile(r'\d+|"[^"]+"')
+
+# 같은 변수 값이 새 입력에서 서로 다른 값으로 바뀌어 어느 쪽으로 바꿀지 알 수 없을 때의 표식
+_AMBIGUOUS = object()
+
+_PlanKey = Tuple[str, Tuple[str, ...], str, int]
+
+
+class PlanCache:
+    """
+    구조가 같은 요청의 계획(plan JSON)을 재사용하는 캐시.
+
+    키: (intent, 정렬된 apis, 입력 골격, 최근 대화 해시). 예) "3시에 회의 잡아줘" / "5시에 회의 잡아줘" -> 같은 키
+    최근 대화도 키에 넣어, 플래너가 다른 세션/다른 맥락에서 해석한 계획이 섞이지 않게 합니다.
+
+    args가 입력에서 그대로 나온 값(입력 원문 또는 변수 값과 정확히 같음)뿐인 계획만 저장합니다.
+    ("내일" -> 날짜, "오후 3시" -> "15:00"처럼 해석/계산된 값은 입력이 바뀌면 틀리므로 저장하지 않음)
+    히트하면 복사본의 변수 값을 새 입력의 값으로 바꾸고, 그렇게 바꿀 수 없는 args가 있는 태스크는
+    args를 비워 실행기(fill_args_fn)가 다시 채우게 합니다. 항목은 ttl_seconds가 지나면 버립니다.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl_seconds: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        # key -> (만료 시각, 입력 원문, 변수 값들, 계획)
+        self._entries: "OrderedDict[_PlanKey, Tuple[float, str, List[str], Dict[str, Any]]]" = OrderedDict()
+
+    @staticmethod
+    def _variables(user_input: str) -> Tuple[str, List[str]]:
+        values = [v.strip('"') for v in _VAR_RE.findall(user_input)]
+        return _VAR_RE.sub("<VAR>", user_input.strip()), values
+
+    def _key(
+        self, user_input: str, intent: str, apis: List[str], recent_turns: Optional[List[Dict[str, Any]]]
+    ) -> Tuple[_PlanKey, List[str]]:
+        skeleton, values = self._variables(user_input)
+        # 플래너 프롬프트에 실리는 것과 같은 문자열로 해시 (프롬프트가 같으면 키도 같음)
+        context = hash(safe_str(recent_turns or [], 800))
+        return (intent, tuple(sorted(set(apis or ()))), skeleton, context), values
+
+    def get(
+        self,
+        *,
+        user_input: str,
+        intent: str,
+        apis: List[str],
+        recent_turns: Optional[List[Dict[str, Any]]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        key, values = self._key(user_input, intent, apis, recent_turns)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, old_input, old_values, plan = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        plan = copy.deepcopy(plan)  # 호출자가 tasks를 수정하므로 항상 복사본을 돌려줌
+        if old_input != user_input:
+            mapping = self._value_mapping(old_values, values)
+            changed = [(o, n) for o, n in zip(old_values, values) if o != n]
+            for t in plan.get("tasks") or []:
+                if isinstance(t, dict):
+                    self._rebind_task(t, old_input, user_input, mapping, changed)
+        return plan
+
+    def put(
+        self,
+        *,
+        user_input: str,
+        intent: str,
+        apis: List[str],
+        plan: Dict[str, Any],
+        recent_turns: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        tasks = plan.get("tasks") if isinstance(plan, dict) else None
+        if not isinstance(tasks, list) or not tasks:
+            return  # 파싱 실패/빈 계획은 저장하지 않음
+        key, values = self._key(user_input, intent, apis, recent_turns)
+        identity = {v: v for v in values}
+        for t in tasks:
+            args = t.get("args") if isinstance(t, dict) else None
+            if isinstance(args, dict) and any(
+                self._rebind_value(v, user_input, user_input, identity) is _AMBIGUOUS for v in args.values()
+            ):
+                return  # 입력 변수로 다시 만들 수 없는(해석/계산된) 인자가 있으면 재사용하지 않음
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, user_input, values, copy.deepcopy(plan))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    @staticmethod
+    def _value_mapping(old_values: List[str], new_values: List[str]) -> Dict[str, Any]:
+        """이전 변수 값 -> 새 변수 값. 같은 이전 값이 서로 다른 새 값으로 바뀌면 _AMBIGUOUS."""
+        mapping: Dict[str, Any] = {}
+        for o, n in zip(old_values, new_values):
+            mapping[o] = n if mapping.get(o, n) == n else _AMBIGUOUS
+        return mapping
+
+    @staticmethod
+    def _rebind_value(value: Any, old_input: str, new_input: str, mapping: Dict[str, Any]) -> Any:
+        """
+        인자 값을 새 입력 기준으로 바꾼 값. 입력 원문/변수 값과 정확히 같을 때만 바꿀 수 있고,
+        그 밖의 값(파생/해석된 값)은 _AMBIGUOUS를 돌려줍니다.
+        """
+        if value is None or isinstance(value, bool):
+            return value
+        if isinstance(value, str):
+            if value == old_input:  # 원문 그대로 넘긴 인자 (예: rag.query의 query)
+                return new_input
+            return mapping.get(value, _AMBIGUOUS)
+        if isinstance(value, (int, float)):
+            new = mapping.get(str(value), _AMBIGUOUS)
+            if new is _AMBIGUOUS or not new.isdigit():
+                return _AMBIGUOUS
+            return type(value)(new)
+        if isinstance(value, (list, dict)) and not value:
+            return value
+        return _AMBIGUOUS
+
+    @staticmethod
+    def _sub_value(text: str, old: str, new: str) -> str:
+        if old.isdigit():  # "3" -> "5"는 "13"/"30" 같은 다른 숫자를 건드리지 않도록 숫자 경계에서만
+            return re.sub(rf"(?<!\d){old}(?!\d)", new, text)
+        return text.replace(old, new)
+
+    @classmethod
+    def _rebind_task(
+        cls,
+        task: Dict[str, Any],
+        old_input: str,
+        new_input: str,
+        mapping: Dict[str, Any],
+        changed: List[Tuple[str, str]],
+    ) -> None:
+        if isinstance(task.get("text"), str):  # 표시용 문구
+            for o, n in changed:
+                task["text"] = cls._sub_value(task["text"], o, n)
+
+        args = task.get("args")
+        if not isinstance(args, dict):
+            return
+        rebound = {k: cls._rebind_value(v, old_input, new_input, mapping) for k, v in args.items()}
+        # 하나라도 새 입력으로 바꿀 수 없으면 args 전체를 비웁니다. (실행기는 args가 비어 있을 때만 다시 채움)
+        task["args"] = {} if any(v is _AMBIGUOUS for v in rebound.values()) else rebound
+
+
+# 플래너는 요청마다 만들어지므로 캐시는 프로세스 단위로 공유합니다.
+plan_cache = PlanCache()
+
+
+# 요청마다 바뀌는 user 메시지 틀. 고정 문구는 모듈 로드 시 한 번만 만들고 구멍만 채웁니다.
+_PLAN_USER_TMPL = (
+    "의도(intent): {intent}\n"
+    "API 후보: {apis}\n\n"
+    "최근 대화(참고): {recent}\n\n"
+    "사용자 요청: {user}\n"
+)
+_REPLAN_USER_TMPL = (
+    "의도(intent): {intent}\n"
+    "API 후보: {apis}\n\n"
+    "현재 계획(tasks): {tasks}\n\n"
+    "관찰(observations): {observations}\n\n"
+    "사용자 요청: {user}\n"
+)
+
+
 @dataclass
 class TaskPlannerAgent:
     """
     LLM 기반 계획(Plan) / 재계획(Replan) 에이전트.
+
+    프롬프트는 매번 같은 부분(역할/도구 목록/반환 형식/규칙)을 system으로,
+    요청마다 바뀌는 부분(intent/apis/최근 대화/사용자 요청)을 user로 나눠 보냅니다.
+    고정 부분이 항상 앞에 오므로 제공자의 프롬프트 캐시가 그 prefix를 재사용합니다.
     """
 
-    llm_chat_fn: Any  # callable(prompt:str)->str
+    llm_chat_fn: Any  # async callable(system:str, user:str)->str
     tools_prompt: str
+    plan_cache: Optional[PlanCache] = None  # 주어지면 구조가 같은 요청은 LLM 호출 없이 계획을 재사용
 
-    def plan(self, *, user_input: str, intent: str, apis: List[str], recent_turns: List[Dict[str, Any]]) -> Dict[str, Any]:
-        prompt = (
+    def __post_init__(self) -> None:
+        self._plan_system = (
             "당신은 태스크 플래너 에이전트입니다.\n"
             "목표: 사용자 요청을 실행 가능한 서브태스크로 분해하고, 각 태스크의 실행 순서/의존성을 포함한 계획을 JSON으로 작성하세요.\n"
             "반드시 JSON만 출력.\n\n"
             "사용 가능한 도구:\n"
             f"{self.tools_prompt}\n\n"
-            f"의도(intent): {intent}\n"
-            f"API 후보: {apis}\n\n"
-            f"최근 대화(참고): {_safe_str(recent_turns, 800)}\n\n"
             "반환 형식(키 고정):\n"
             '{ "tasks":[{"id":"t1","text":"...","tool":"weather.get|...|none","args":{...},"depends_on":["t0"],"produces":"짧게"}], "final_step":"tN" }\n\n'
             "규칙:\n"
             "- tool이 필요 없으면 \"none\"\n"
             "- args는 가능한 채워서 주고, 불확실하면 비워두고 실행기(Executor)가 채우게 하세요.\n"
-            "- depends_on은 task id 리스트\n\n"
-            f"사용자 요청: {user_input}\n"
+            "- depends_on은 task id 리스트\n"
+        )
+        self._replan_system = (
+            "당신은 태스크 플래너 에이전트입니다. 실행 중 관찰 결과를 반영해 계획을 업데이트하세요.\n"
+            "반드시 JSON만 출력.\n\n"
+            "사용 가능한 도구:\n"
+            f"{self.tools_prompt}\n\n"
+            "반환 형식(키 고정):\n"
+            '{ "tasks":[{"id":"t1","text":"...","tool":"...|none","args":{...},"depends_on":["..."],"produces":"..."}], "final_step":"tN" }\n'
+        )
+
+    async def plan(self, *, user_input: str, intent: str, apis: List[str], recent_turns: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if self.plan_cache is not None:
+            cached = self.plan_cache.get(user_input=user_input, intent=intent, apis=apis, recent_turns=recent_turns)
+            if cached is not None:
+                return cached
+        prompt = _PLAN_USER_TMPL.format(
+            intent=intent, apis=apis, recent=safe_str(recent_turns, 800), user=user_input
         )
-        return _extract_json_object(self.llm_chat_fn(prompt))
+        plan = extract_json_object(await self.llm_chat_fn(self._plan_system, prompt))
+        if self.plan_cache is not None:
+            self.plan_cache.put(user_input=user_input, intent=intent, apis=apis, plan=plan, recent_turns=recent_turns)
+        return plan
 
-    def replan(
+    async def replan(
         self,
         *,
         user_input: str,
@@ -82,19 +297,11 @@ class TaskPlannerAgent:
         current_tasks: List[Dict[str, Any]],
         observations: List[Dict[str, Any]],
     ) -> Dict[str, Any]:
-        prompt = (
-            "당신은 태스크 플래너 에이전트입니다. 실행 중 관찰 결과를 반영해 계획을 업데이트하세요.\n"
-            "반드시 JSON만 출력.\n\n"
-            "사용 가능한 도구:\n"
-            f"{self.tools_prompt}\n\n"
-            f"의도(intent): {intent}\n"
-            f"API 후보: {apis}\n\n"
-            f"현재 계획(tasks): {_safe_str(current_tasks, 1400)}\n\n"
-            f"관찰(observations): {_safe_str(observations, 1400)}\n\n"
-            "반환 형식(키 고정):\n"
-            '{ "tasks":[{"id":"t1","text":"...","tool":"...|none","args":{...},"depends_on":["..."],"produces":"..."}], "final_step":"tN" }\n\n'
-            f"사용자 요청: {user_input}\n"
+        prompt = _REPLAN_USER_TMPL.format(
+            intent=intent,
+            apis=apis,
+            tasks=safe_str(current_tasks, 1400),
+            observations=safe_str(observations, 1400),
+            user=user_input,
         )
-        return _extract_json_object(self.llm_chat_fn(prompt))
-
-
+        return extract_json_object(await self.llm_chat_fn(self._replan_system, prompt))
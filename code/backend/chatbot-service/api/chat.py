@@ -2,13 +2,78 @@
 채팅 API 라우트.
 """
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
-from models import ChatRequest, ChatResponse, ChatMessage
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+from models import ChatRequest, ChatResponse
 from services.llm_service import llm_service
 from services.chat_service import chat_service
 import json
 
-router = APIRouter(prefix="/api/chat", tags=["chat"])
+try:  # optional: orjson이 있으면 응답/SSE 프레임 직렬화를 orjson으로 처리
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+router = APIRouter(
+    prefix="/api/chat",
+    tags=["chat"],
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse,
+)
+
+
+# 스트림 종료 프레임 (StreamingResponse는 bytes를 인코딩 없이 그대로 send)
+_SSE_DONE = b"data: [DONE]\n\n"
+
+
+def _json_bytes(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class _SSEFrames:
+    """
+    스트리밍 요청 1건의 SSE 프레임 인코더.
+
+    프레임 모양은 매번 같으므로 고정 부분(conversation_id 등)은 한 번만 직렬화하고,
+    todoList는 todo/completed가 바뀔 때만 다시 직렬화합니다.
+    (토큰 스트리밍 중에는 partial만 바뀌므로 todoList 바이트를 그대로 재사용)
+    """
+
+    def __init__(self, conversation_id):
+        self._prefix = (
+            b'data: {"content":"","conversation_id":' + _json_bytes(conversation_id)
+            + b',"role":"assistant","breakpoints":[{"id":"todo-breakpoint","isTodoList":true,"todoList":'
+        )
+        self._todo = None
+        self._items: list = []
+        self._completed = -1
+        self._todo_json = b"[]"
+
+    def _todo_list(self, todo: list, completed_count: int) -> bytes:
+        snapshot = tuple(todo)  # 같은 리스트가 제자리에서 바뀌어도 감지되도록 내용으로 비교
+        if snapshot != self._todo:
+            self._todo = snapshot
+            self._items = [{"id": f"todo-{i+1}", "text": t, "completed": False} for i, t in enumerate(todo)]
+            self._completed = -1
+        if completed_count != self._completed:
+            # 항목 dict는 그대로 두고 completed 플래그만 바꿉니다.
+            for i, item in enumerate(self._items):
+                item["completed"] = i < completed_count
+            self._completed = completed_count
+            self._todo_json = _json_bytes(self._items)
+        return self._todo_json
+
+    def frame(self, *, todo: list, completed_count: int, current_status: str, current_response: str = "", final_response: str | None = None, is_thinking: bool = True, is_streaming: bool = True) -> bytes:
+        return b"".join((
+            self._prefix,
+            self._todo_list(todo, completed_count),
+            b'}],"currentStatus":', _json_bytes(current_status),
+            b',"currentResponse":', _json_bytes(current_response or ""),
+            b',"finalResponse":', _json_bytes(final_response or ""),
+            b',"isThinking":', b"true" if is_thinking else b"false",
+            b',"isStreaming":', b"true" if is_streaming else b"false",
+            b"}\n\n",
+        ))
 
 
 @router.post("", response_model=ChatResponse)
@@ -17,15 +82,8 @@ async def chat(request: ChatRequest):
     채팅 메시지를 전송하고 응답을 반환합니다.
     """
     try:
-        # messages가 있으면 ChatMessage 객체로 변환
-        conversation_history = None
-        if request.messages:
-            conversation_history = [
-                ChatMessage(role=msg["role"], content=msg["content"])
-                if isinstance(msg, dict)
-                else msg
-                for msg in request.messages
-            ]
+        # messages는 요청 파싱 때 이미 ChatMessage 리스트로 검증돼 있으므로 다시 만들지 않습니다.
+        conversation_history = request.messages or None
         
         # 런타임이 LLM on/off 모두 처리합니다.
         conversation_id = request.conversation_id
@@ -39,12 +97,19 @@ async def chat(request: ChatRequest):
         # 런타임이 생성/반환한 session id(conversation_id)를 사용
         conversation_id = result.get("conversation_id") or request.conversation_id
         
-        return ChatResponse(
-            message=response_text,
-            conversation_id=conversation_id,
-            role="assistant",
-            meta=meta,
-        )
+        body = {
+            "message": response_text,
+            "conversation_id": conversation_id,
+            "role": "assistant",
+            "meta": meta,
+        }
+        if orjson is not None:
+            # 모델 검증/jsonable_encoder를 거치지 않고 바로 직렬화
+            try:
+                return ORJSONResponse(body)
+            except TypeError:  # meta에 orjson이 모르는 타입이 섞인 경우
+                pass
+        return ChatResponse(**body)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -55,41 +120,12 @@ async def chat_stream(request: ChatRequest):
     채팅 응답을 스트리밍(SSE)으로 반환합니다.
     """
     try:
-        # messages가 있으면 ChatMessage 객체로 변환
-        conversation_history = None
-        if request.messages:
-            conversation_history = [
-                ChatMessage(role=msg["role"], content=msg["content"])
-                if isinstance(msg, dict)
-                else msg
-                for msg in request.messages
-            ]
+        # messages는 요청 파싱 때 이미 ChatMessage 리스트로 검증돼 있으므로 다시 만들지 않습니다.
+        conversation_history = request.messages or None
         
         async def generate():
-            def _todo_items(todo: list[str], completed_count: int):
-                items = []
-                for i, t in enumerate(todo):
-                    items.append({"id": f"todo-{i+1}", "text": t, "completed": i < completed_count})
-                return items
-
-            def _payload(*, todo: list[str], completed_count: int, current_status: str, current_response: str = "", final_response: str | None = None, is_thinking: bool = True, is_streaming: bool = True):
-                return {
-                    "content": "",
-                    "conversation_id": request.conversation_id,
-                    "role": "assistant",
-                    "breakpoints": [
-                        {
-                            "id": "todo-breakpoint",
-                            "isTodoList": True,
-                            "todoList": _todo_items(todo, completed_count),
-                        }
-                    ],
-                    "currentStatus": current_status,
-                    "currentResponse": current_response or "",
-                    "finalResponse": final_response or "",
-                    "isThinking": is_thinking,
-                    "isStreaming": is_streaming,
-                }
+            frames = _SSEFrames(request.conversation_id)
+            pending: list[bytes] = []  # batch 이벤트 프레임: 다음 프레임과 함께 한 번의 write로 보냄
 
             async for ev in chat_service.stream(message=request.message, conversation_id=request.conversation_id, conversation_history=conversation_history):
                 todo = ev.get("todo") or []
@@ -100,14 +136,20 @@ async def chat_stream(request: ChatRequest):
                 partial = ev.get("partial") or ""
 
                 if done:
-                    yield f"data: {json.dumps(_payload(todo=todo, completed_count=len(todo), current_status='완료', current_response='', final_response=str(final or ''), is_thinking=False, is_streaming=False), ensure_ascii=False)}\n\n"
-                    yield "data: [DONE]\n\n"
+                    pending.append(frames.frame(todo=todo, completed_count=len(todo), current_status='완료', current_response='', final_response=str(final or ''), is_thinking=False, is_streaming=False))
+                    pending.append(_SSE_DONE)
+                    yield b"".join(pending)
                     return
 
-                yield f"data: {json.dumps(_payload(todo=todo, completed_count=completed, current_status=status, current_response=str(partial or ''), is_thinking=not bool(partial), is_streaming=True), ensure_ascii=False)}\n\n"
+                pending.append(frames.frame(todo=todo, completed_count=completed, current_status=status, current_response=str(partial or ''), is_thinking=not bool(partial), is_streaming=True))
+                if ev.get("batch"):
+                    continue
+                yield pending[0] if len(pending) == 1 else b"".join(pending)
+                pending.clear()
 
-            yield f"data: {json.dumps(_payload(todo=[], completed_count=0, current_status='완료', final_response='', is_thinking=False, is_streaming=False), ensure_ascii=False)}\n\n"
-            yield "data: [DONE]\n\n"
+            pending.append(frames.frame(todo=[], completed_count=0, current_status='완료', final_response='', is_thinking=False, is_streaming=False))
+            pending.append(_SSE_DONE)
+            yield b"".join(pending)
             return
         
         return StreamingResponse(
@@ -116,6 +158,8 @@ async def chat_stream(request: ChatRequest):
             headers={
                 "Cache-Control": "no-cache",
                 "Connection": "keep-alive",
+                # nginx 등 리버스 프록시가 프레임을 모아 두지 않고 바로 흘려보내도록
+                "X-Accel-Buffering": "no",
             }
         )
     except Exception as e:
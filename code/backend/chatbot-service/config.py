@@ -2,40 +2,148 @@
 Configuration management for the chatbot backend.
 Supports both OpenAI and Azure OpenAI providers.
 """
+import functools
 import os
+import re
 from pathlib import Path
-from typing import Any, Literal
+from typing import Any, Callable, Literal
 
 import yaml
 from dotenv import load_dotenv
-from pydantic_settings import BaseSettings
+from pydantic import field_validator
+from pydantic.fields import FieldInfo
+from pydantic_settings import BaseSettings, EnvSettingsSource, PydanticBaseSettingsSource, SettingsConfigDict
 
 # Directories
 SERVICE_DIR = Path(__file__).parent                    # code/backend/chatbot-service
 BACKEND_DIR = SERVICE_DIR.parent                       # code/backend
 
-# Load environment variables (backend-level first, then service-level override if present)
-load_dotenv(dotenv_path=BACKEND_DIR / ".env", override=False)
-load_dotenv(dotenv_path=SERVICE_DIR / ".env", override=True)
+
+@functools.cache
+def _load_dotenv_once() -> None:
+    """Load .env files once per process (backend-level first, then service-level override); missing files are skipped."""
+    backend_env = BACKEND_DIR / ".env"
+    service_env = SERVICE_DIR / ".env"
+    if backend_env.is_file():
+        load_dotenv(dotenv_path=backend_env, override=False)
+    if service_env.is_file():
+        load_dotenv(dotenv_path=service_env, override=True)
+
+
+# Load environment variables at import: services read their URLs from os.environ when they are constructed
+_load_dotenv_once()
+
+# Use libyaml's C loader when PyYAML was built against it (same safe semantics, much faster parse)
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# ${VAR} / ${VAR:-default} placeholders inside config.yml values
+_VAR_RE = re.compile(r"\$\{([A-Za-z_][A-Za-z0-9_]*)(?::-([^}]*))?\}")
 
 # Config files (backend-level first, then service-level override)
 BACKEND_CONFIG_FILE = BACKEND_DIR / "config.yml"
 SERVICE_CONFIG_FILE = SERVICE_DIR / "config.yml"
 
 
+@functools.lru_cache(maxsize=None)
+def _parse_yaml(path_str: str, mtime_ns: int) -> dict[str, Any]:
+    """Parse a YAML file once per (path, mtime); an edited file gets a new mtime and is re-read."""
+    with open(path_str, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=YAML_LOADER) or {}
+
+
+def _read_yaml(path: Path) -> dict[str, Any]:
+    """Return the parsed config at path, or {} when it does not exist."""
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    # Shallow copy: load_config only reads the nested sections (and _deep_merge builds new dicts)
+    return dict(_parse_yaml(str(path), mtime_ns))
+
+
+def _expand(value: Any, env: dict[str, str]) -> str:
+    """Resolve ${VAR} and ${VAR:-default} in one regex pass (":-" falls back when VAR is unset or empty)."""
+    return _VAR_RE.sub(lambda m: env.get(m.group(1)) or (m.group(2) or ""), str(value or ""))
+
+
 def _deep_merge(base: dict[str, Any], override: dict[str, Any]) -> dict[str, Any]:
-    """Recursively merge override into base (override wins)."""
-    out: dict[str, Any] = dict(base)
-    for k, v in (override or {}).items():
-        if isinstance(v, dict) and isinstance(out.get(k), dict):
-            out[k] = _deep_merge(out[k], v)  # type: ignore[arg-type]
-        else:
-            out[k] = v
+    """Merge override into base (override wins), walking nested dicts with a work stack instead of recursion."""
+    out: dict[str, Any] = {}
+    stack = [(out, base, override)]
+    while stack:
+        dst, b, o = stack.pop()
+        dst.update(b)
+        for k, v in (o or {}).items():
+            cur = dst.get(k)
+            if isinstance(v, dict) and isinstance(cur, dict):
+                # Only sections present on both sides get a fresh dict; everything else is shared by reference
+                merged: dict[str, Any] = {}
+                dst[k] = merged
+                stack.append((merged, cur, v))
+            else:
+                dst[k] = v
     return out
 
 
+def _llm_yaml_values() -> dict[str, Any]:
+    """config.yml `llm` section flattened to LLMConfig field names, with ${VAR} placeholders expanded."""
+    backend_cfg = _read_yaml(BACKEND_CONFIG_FILE)
+    service_cfg = _read_yaml(SERVICE_CONFIG_FILE)
+    # IMPORTANT:
+    # - LLM config is controlled centrally by backend/config.yml (service overrides disabled by default)
+    # - If backend config is missing, fall back to service config.yml (project-local defaults)
+    llm_data = backend_cfg.get("llm") or service_cfg.get("llm") or {}
+    env = os.environ.copy()
+
+    values: dict[str, Any] = {}
+    if "provider" in llm_data:
+        values["provider"] = llm_data["provider"]
+    for section in ("openai", "azure_openai"):
+        for key, value in (llm_data.get(section) or {}).items():
+            values[f"{section}_{key}"] = _expand(value, env) if isinstance(value, str) else value
+    return values
+
+
+def _server_yaml_values() -> dict[str, Any]:
+    """config.yml `server` section (backend -> service merge; service wins)."""
+    # Server config can be overridden per service via chatbot-service/config.yml
+    backend_cfg = _read_yaml(BACKEND_CONFIG_FILE)
+    service_cfg = _read_yaml(SERVICE_CONFIG_FILE)
+    return _deep_merge(backend_cfg.get("server", {}) or {}, service_cfg.get("server", {}) or {})
+
+
+class _YamlSettingsSource(PydanticBaseSettingsSource):
+    """Settings source backed by the (cached) config.yml files; keys not declared on the model are ignored."""
+
+    def __init__(self, settings_cls: type[BaseSettings], load: Callable[[], dict[str, Any]]):
+        super().__init__(settings_cls)
+        fields = settings_cls.model_fields
+        self._values = {k: v for k, v in load().items() if k in fields}
+
+    def get_field_value(self, field: FieldInfo, field_name: str) -> tuple[Any, str, bool]:
+        return self._values.get(field_name), field_name, False
+
+    def __call__(self) -> dict[str, Any]:
+        return dict(self._values)
+
+
+class _LLMEnvSource(EnvSettingsSource):
+    """Environment source for LLMConfig: `provider` comes from LLM_PROVIDER rather than a bare PROVIDER env var."""
+
+    def get_field_value(self, field: FieldInfo, field_name: str) -> tuple[Any, str, bool]:
+        if field_name == "provider":
+            return self.env_vars.get("llm_provider"), field_name, False
+        return super().get_field_value(field, field_name)
+
+
 class LLMConfig(BaseSettings):
-    """LLM provider configuration"""
+    """
+    LLM provider configuration.
+    Sources, highest priority first: init kwargs > environment (OPENAI_API_KEY, AZURE_OPENAI_*, LLM_PROVIDER ...) > config.yml.
+    (.env files are already loaded into os.environ by _load_dotenv_once)
+    """
+    model_config = SettingsConfigDict(env_prefix="", extra="ignore")
+
     provider: Literal["openai", "azure_openai", "mock"] = "mock"
     
     # OpenAI settings
@@ -53,81 +161,52 @@ class LLMConfig(BaseSettings):
     azure_openai_temperature: float = 0.7
     azure_openai_max_tokens: int = 2000
 
+    # Semantic response cache (off by default: agentic prompts embed live tool results)
+    semantic_cache_enabled: bool = False
+    embedding_model: str = "text-embedding-3-small"
+    azure_embedding_deployment_name: str = ""
+
+    @field_validator("azure_openai_api_version")
+    @classmethod
+    def _default_api_version(cls, v: str) -> str:
+        # An empty value (e.g. AZURE_OPENAI_API_VERSION= in .env) means "use the default"
+        return v or "2024-12-01-preview"
+
+    @classmethod
+    def settings_customise_sources(
+        cls,
+        settings_cls: type[BaseSettings],
+        init_settings: PydanticBaseSettingsSource,
+        env_settings: PydanticBaseSettingsSource,
+        dotenv_settings: PydanticBaseSettingsSource,
+        file_secret_settings: PydanticBaseSettingsSource,
+    ) -> tuple[PydanticBaseSettingsSource, ...]:
+        return init_settings, _LLMEnvSource(settings_cls), _YamlSettingsSource(settings_cls, _llm_yaml_values)
+
 
 class ServerConfig(BaseSettings):
-    """Server configuration"""
+    """Server configuration (config.yml only; generic HOST/PORT env vars are deliberately not read)"""
+    model_config = SettingsConfigDict(extra="ignore")
+
     host: str = "0.0.0.0"
     port: int = 8000
     cors_origins: list[str] = ["http://localhost:5173", "http://localhost:3000"]
 
+    @classmethod
+    def settings_customise_sources(
+        cls,
+        settings_cls: type[BaseSettings],
+        init_settings: PydanticBaseSettingsSource,
+        env_settings: PydanticBaseSettingsSource,
+        dotenv_settings: PydanticBaseSettingsSource,
+        file_secret_settings: PydanticBaseSettingsSource,
+    ) -> tuple[PydanticBaseSettingsSource, ...]:
+        return init_settings, _YamlSettingsSource(settings_cls, _server_yaml_values)
+
 
 def load_config():
     """Load configuration from config.yml and environment variables"""
-    backend_cfg: dict[str, Any] = {}
-    service_cfg: dict[str, Any] = {}
-
-    if BACKEND_CONFIG_FILE.exists():
-        with open(BACKEND_CONFIG_FILE, "r", encoding="utf-8") as f:
-            backend_cfg = yaml.safe_load(f) or {}
-
-    if SERVICE_CONFIG_FILE.exists():
-        with open(SERVICE_CONFIG_FILE, "r", encoding="utf-8") as f:
-            service_cfg = yaml.safe_load(f) or {}
-
-    # IMPORTANT:
-    # - LLM config is controlled centrally by backend/config.yml (service overrides disabled by default)
-    # - Server config can be overridden per service via chatbot-service/config.yml
-    config_data = dict(backend_cfg)
-    
-    # Extract LLM config
-    # - Prefer backend/config.yml (centralized, "forced")
-    # - If backend config is missing, fall back to service config.yml (project-local defaults)
-    llm_data = (backend_cfg.get("llm") or service_cfg.get("llm") or {})
-    provider = llm_data.get("provider", "mock")
-    
-    # Get OpenAI config
-    openai_data = llm_data.get("openai", {})
-    openai_api_key = os.getenv(
-        "OPENAI_API_KEY",
-        openai_data.get("api_key", "").replace("${OPENAI_API_KEY}", os.getenv("OPENAI_API_KEY", ""))
-    )
-    
-    # Get Azure OpenAI config
-    azure_data = llm_data.get("azure_openai", {})
-    azure_openai_api_key = os.getenv(
-        "AZURE_OPENAI_API_KEY",
-        azure_data.get("api_key", "").replace("${AZURE_OPENAI_API_KEY}", os.getenv("AZURE_OPENAI_API_KEY", ""))
-    )
-    azure_openai_endpoint = os.getenv(
-        "AZURE_OPENAI_ENDPOINT",
-        azure_data.get("endpoint", "").replace("${AZURE_OPENAI_ENDPOINT}", os.getenv("AZURE_OPENAI_ENDPOINT", ""))
-    )
-    azure_openai_deployment_name = os.getenv(
-        "AZURE_OPENAI_DEPLOYMENT_NAME",
-        azure_data.get("deployment_name", "").replace("${AZURE_OPENAI_DEPLOYMENT_NAME}", os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", ""))
-    )
-    azure_openai_api_version = os.getenv(
-        "AZURE_OPENAI_API_VERSION",
-        azure_data.get("api_version", "").replace("${AZURE_OPENAI_API_VERSION:-2024-12-01-preview}", os.getenv("AZURE_OPENAI_API_VERSION", "2024-12-01-preview"))
-    )
-    # If api_version is still empty or contains the template string, use default
-    if not azure_openai_api_version or "${" in azure_openai_api_version:
-        azure_openai_api_version = "2024-12-01-preview"
-    
-    llm_config = LLMConfig(
-        provider=provider,
-        openai_api_key=openai_api_key,
-        openai_model=openai_data.get("model", "gpt-4o-mini"),
-        openai_base_url=openai_data.get("base_url", "https://api.openai.com/v1"),
-        openai_temperature=openai_data.get("temperature", 0.7),
-        openai_max_tokens=openai_data.get("max_tokens", 2000),
-        azure_openai_api_key=azure_openai_api_key,
-        azure_openai_api_version=azure_openai_api_version,
-        azure_openai_endpoint=azure_openai_endpoint,
-        azure_openai_deployment_name=azure_openai_deployment_name,
-        azure_openai_temperature=azure_data.get("temperature", 0.7),
-        azure_openai_max_tokens=azure_data.get("max_tokens", 2000),
-    )
+    llm_config = LLMConfig()
 
     # Lab-friendly fallback: if credentials are missing, run in mock mode.
     if llm_config.provider == "openai" and not llm_config.openai_api_key:
@@ -135,18 +214,31 @@ def load_config():
     if llm_config.provider == "azure_openai":
         if not (llm_config.azure_openai_api_key and llm_config.azure_openai_endpoint and llm_config.azure_openai_deployment_name):
             llm_config.provider = "mock"
-    
-    # Extract server config (backend -> service merge; service wins)
-    server_data = _deep_merge(backend_cfg.get("server", {}) or {}, service_cfg.get("server", {}) or {})
-    server_config = ServerConfig(
-        host=server_data.get("host", "0.0.0.0"),
-        port=server_data.get("port", 8000),
-        cors_origins=server_data.get("cors_origins", ["http://localhost:5173", "http://localhost:3000"]),
-    )
-    
+
+    server_config = ServerConfig()
     return llm_config, server_config
 
 
-# Global config instances
-llm_config, server_config = load_config()
+@functools.cache
+def get_config() -> tuple[LLMConfig, ServerConfig]:
+    """Process-wide (llm_config, server_config); loaded once no matter how often it is asked for."""
+    return load_config()
+
+
+def get_llm_config() -> LLMConfig:
+    return get_config()[0]
+
+
+def get_server_config() -> ServerConfig:
+    return get_config()[1]
+
+
+def __getattr__(name: str) -> Any:
+    # Backward compatible `config.llm_config` / `config.server_config`, resolved on first access
+    # instead of parsing the config files at import time.
+    if name == "llm_config":
+        return get_llm_config()
+    if name == "server_config":
+        return get_server_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
@@ -1,42 +1,115 @@
 """
 FastAPI 애플리케이션 엔트리포인트.
 """
+import json
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from config import server_config
+from fastapi.responses import JSONResponse, ORJSONResponse
+from config import get_server_config
 from api import chat
+from services.chat_service import chat_service
+from services.llm_service import llm_service
+from agents.context_manager import context_manager
+
+try:  # optional: orjson이 있으면 앱 전체 기본 응답을 orjson으로 직렬화
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+_ROOT_BODY = {"message": "Edu Agentic RAG Chatbot API", "version": "1.0.0", "docs": "/docs"}
+_HEALTH_BODY = {"status": "healthy"}
+
+
+def _static_json(body: dict) -> tuple:
+    data = orjson.dumps(body) if orjson is not None else json.dumps(body, separators=(",", ":")).encode()
+    return [(b"content-type", b"application/json"), (b"content-length", str(len(data)).encode())], data
+
+
+class _StaticGetMiddleware:
+    """
+    고정 응답 GET 엔드포인트(/, /health)를 라우터/직렬화 없이 미리 만든 바이트로 바로 응답하는 ASGI 미들웨어.
+    liveness probe처럼 자주 들어오는 요청의 비용을 줄입니다. (라우트 정의는 OpenAPI 문서용으로 그대로 둠)
+    """
+
+    def __init__(self, app, responses: dict):
+        self.app = app
+        self.responses = responses  # path -> (headers, body)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "GET":
+            hit = self.responses.get(scope["path"])
+            if hit is not None:
+                headers, body = hit
+                await send({"type": "http.response.start", "status": 200, "headers": headers})
+                await send({"type": "http.response.body", "body": body})
+                return
+        await self.app(scope, receive, send)
+
 
 app = FastAPI(
     title="Edu Agentic RAG Chatbot API",
     description="OpenAI / Azure OpenAI를 지원하는 실습용 챗봇 API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse,
+)
+
+# 고정 응답(/, /health) 처리. 나중에 추가한 미들웨어가 바깥에 오므로 CORS보다 먼저 등록해
+# CORS 안쪽에서 실행되게 합니다. (브라우저의 cross-origin GET /health에도 CORS 헤더가 붙음)
+app.add_middleware(
+    _StaticGetMiddleware,
+    responses={"/": _static_json(_ROOT_BODY), "/health": _static_json(_HEALTH_BODY)},
 )
 
 # CORS 미들웨어
+# 와일드카드("*") 대신 실제로 쓰는 메서드/헤더만 명시하면 preflight 응답 헤더를 미리 만들어 두고 재사용합니다.
+# (프론트엔드는 POST + Content-Type: application/json만 보냄)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=server_config.cors_origins,
+    allow_origins=list(dict.fromkeys(get_server_config().cors_origins)),  # 중복 제거(순서 유지)
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "OPTIONS"],
+    allow_headers=["Content-Type", "Authorization"],
 )
 
 # 라우터 등록
 app.include_router(chat.router)
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    """종료 시 다운스트림 서비스/LLM용 커넥션 풀과 세션 정리 스레드를 정리합니다."""
+    await chat_service.aclose()
+    await llm_service.aclose()
+    context_manager.shutdown()
+
+
 @app.get("/")
 async def root():
-    """루트 엔드포인트"""
-    return {
-        "message": "Edu Agentic RAG Chatbot API",
-        "version": "1.0.0",
-        "docs": "/docs"
-    }
+    """루트 엔드포인트 (실제 응답은 _StaticGetMiddleware가 처리)"""
+    return _ROOT_BODY
 
 
 @app.get("/health")
 async def health():
-    """헬스 체크 엔드포인트"""
-    return {"status": "healthy"}
+    """헬스 체크 엔드포인트 (실제 응답은 _StaticGetMiddleware가 처리)"""
+    return _HEALTH_BODY
+
+
+
+if __name__ == "__main__":
+    # `python main.py`로 바로 띄울 때도 uvloop(이벤트 루프) / httptools(HTTP 파서)를 씁니다.
+    # (uvicorn CLI 실행은 start_services.py / README 참고)
+    import importlib.util
+    import sys
+
+    import uvicorn
 
+    server_config = get_server_config()
+    uvicorn.run(
+        "main:app",
+        host=server_config.host,
+        port=server_config.port,
+        loop="uvloop" if sys.platform != "win32" and importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools" if importlib.util.find_spec("httptools") else "h11",
+    )
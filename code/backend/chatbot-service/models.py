@@ -1,18 +1,24 @@
 """
 채팅 API 요청/응답 스키마(Pydantic 모델).
 """
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, List, Dict, Any, Literal
 
 
 class ChatMessage(BaseModel):
     """단일 채팅 메시지"""
-    role: str  # "user" | "assistant"
+    # 히스토리 메시지는 만들어진 뒤 바뀌지 않으므로 frozen(불변 + 해시 가능)으로 둡니다.
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
+    # 허용 값을 Literal로 좁혀 pydantic-core가 고정 문자열 집합 비교만 하게 합니다.
+    role: Literal["user", "assistant", "system"]
     content: str
 
 
 class ChatRequest(BaseModel):
     """프론트엔드 → 백엔드 요청"""
+    model_config = ConfigDict(extra="ignore")
+
     message: str
     conversation_id: Optional[str] = None
     messages: Optional[List[ChatMessage]] = None  # 대화 히스토리
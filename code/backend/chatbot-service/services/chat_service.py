@@ -16,37 +16,42 @@ Multi-Agent 아키텍처:
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from contextlib import aclosing, asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
 import os
 import re
 
 import httpx
 
 from models import ChatMessage
-from agents.intent_classifier import IntentClassifier
+from agents.intent_classifier import IntentClassifier, has_create_verb, keyword_intent
 from agents.context_manager import get_or_create_session, context_manager
-from agents.task_planner_agent import TaskPlannerAgent
+from agents.task_planner_agent import TaskPlannerAgent, extract_json_object, plan_cache, safe_str
 from services.llm_service import llm_service
-from services.tool_executor import ToolExecutor, tool_defs, tools_prompt
+from services.tool_executor import ToolExecutor, decode_json, tool_defs, tools_prompt
 import time
 
 
+# IntentClassifier 키워드 의도 -> 규칙 기반 라우팅 이름
+_RULE_INTENTS = {
+    "weather_query": "weather",
+    "calendar": "calendar",
+    "file_search": "file_search",
+    "notification_send": "notify",
+    "help": "help",
+}
+
+
 def infer_intent(text: str) -> str:
+    # IntentClassifier와 같은 키워드 테이블/오토마톤을 써서 입력을 한 번만 스캔합니다.
     s = text.lower()
-    if any(k in s for k in ["날씨", "기온", "비", "눈", "우산"]):
-        return "weather"
-    if any(k in s for k in ["일정", "회의", "미팅", "스케줄"]):
-        if any(k in s for k in ["잡아", "생성", "추가", "만들"]):
-            return "calendar_create"
-        return "calendar"
-    if any(k in s for k in ["파일", "문서", "자료", "명세", "회의록"]):
-        return "file_search"
-    if any(k in s for k in ["알림", "공지", "보내", "전송", "슬랙", "이메일", "sms", "문자"]):
-        return "notify"
-    if any(k in s for k in ["도움말", "뭐 할 수", "할 수 있어"]):
-        return "help"
-    return "chat"
+    kind = keyword_intent(s)
+    if kind == "calendar" and has_create_verb(s):
+        return "calendar_create"
+    return _RULE_INTENTS.get(kind, "chat")
 
 
 def _extract_city(text: str) -> str:
@@ -67,6 +72,23 @@ def _extract_time(text: str) -> str:
         return f"{int(m.group(1)):02d}:{int(m.group(2)):02d}"
     return "09:00"
 
+# 제목 정리/채널 감지용 키워드는 각각 한 번의 정규식 스캔으로 처리합니다.
+_TITLE_NOISE_RE = re.compile("|".join(map(re.escape, ("일정", "회의", "미팅", "잡아줘", "추가해줘", "생성해줘", "만들어줘"))))
+_CHANNEL_RE = re.compile(r"(?P<slack>슬랙|slack)|(?P<email>이메일|email|메일)|(?P<sms>문자|sms)")
+
+
+def _extract_title(text: str) -> str:
+    return _TITLE_NOISE_RE.sub("", text).strip() or "새 일정"
+
+
+def _detect_channel(text: str) -> str:
+    """알림 채널 (여러 개가 언급되면 slack > email > sms, 없으면 slack)"""
+    hits = {m.lastgroup for m in _CHANNEL_RE.finditer(text.lower())}
+    for channel in ("slack", "email", "sms"):
+        if channel in hits:
+            return channel
+    return "slack"
+
 def _format_todo(tasks: List[str]) -> str:
     if not tasks:
         return ""
@@ -81,42 +103,146 @@ def _with_plan(response_text: str, plan: Dict[str, Any]) -> str:
     return f"{todo}\n\n### 실행 결과\n{response_text}"
 
 
+_WEATHER_TODO = ("도시/기간 등 파라미터를 추출한다", "weather-service를 호출해 데이터를 가져온다", "결과를 요약해 답변한다")
+_CALENDAR_TODO = ("날짜(오늘/내일/특정일)를 해석한다", "calendar-service를 호출해 일정을 가져온다", "일정/빈시간을 요약한다")
+_NOTIFICATION_TODO = ("채널(email/slack/sms)과 수신자를 결정한다", "notification-service로 발송한다", "발송 결과를 확인한다")
+
+# intent -> (기본 단계, 알림 단계를 덧붙일 수 있는지). 별칭(weather/calendar/notify)도 같은 템플릿을 공유합니다.
+_TODO_TEMPLATES: Dict[str, Tuple[Tuple[str, ...], bool]] = {
+    "weather_query": (_WEATHER_TODO, True),
+    "weather": (_WEATHER_TODO, True),
+    "calendar_query": (_CALENDAR_TODO, True),
+    "calendar": (_CALENDAR_TODO, True),
+    "calendar_create": (("제목/시간/날짜를 추출한다", "calendar-service에 이벤트 생성을 요청한다", "생성 결과를 확인해 사용자에게 안내한다"), True),
+    "file_search": (("검색 키워드를 정제한다", "file-service를 호출해 검색한다", "상위 결과를 리스트업한다"), True),
+    "notification_send": (_NOTIFICATION_TODO, False),
+    "notify": (_NOTIFICATION_TODO, False),
+    "help": (("가능한 기능/예시를 정리해서 안내한다",), False),
+}
+_DEFAULT_TODO = (("rag-service(Qdrant)를 질의해 관련 문서를 찾는다", "근거(출처)와 함께 간단히 답한다"), False)
+_NOTIFY_FOLLOWUP_TODO = ("팀에게 전달할 메시지를 구성한다", "notification-service로 발송한다", "발송 결과를 확인한다")
+
+
 def _rule_todo_list(user_input: str, analysis: Dict[str, Any]) -> List[str]:
     """
     룰 기반 To-Do 생성기 (UI 전용 폴백).
     - 에이전트가 아니라 “화면 표시용” 단계 목록 생성만 담당
     - LLM이 비활성화된 경우에만 사용
     """
-    intent = analysis.get("intent", "chat")
-    apis: List[str] = list(analysis.get("apis") or [])
-    wants_notify = "notification" in apis or bool((analysis.get("parameters") or {}).get("notify"))
+    steps, notifiable = _TODO_TEMPLATES.get(analysis.get("intent", "chat"), _DEFAULT_TODO)
+    if notifiable and (
+        "notification" in (analysis.get("apis") or ()) or bool((analysis.get("parameters") or {}).get("notify"))
+    ):
+        return [*steps, *_NOTIFY_FOLLOWUP_TODO]
+    return list(steps)
+
+
+# 분류기/플래너는 요청별 상태가 없으므로(입력은 메서드 인자로 전달) 프로세스당 하나만 만들어 재사용합니다.
+# (플래너는 생성 시 고정 system 프롬프트를 만들어 두므로 요청마다 다시 만들 필요가 없음)
+# llm_service 메서드는 호출 시점에 찾도록 lambda로 감쌉니다. (lambda는 코루틴을 돌려주고 호출 측이 await)
+_LLM_CLASSIFIER = IntentClassifier(llm_chat_fn=lambda prompt: llm_service.chat(prompt))
+_KEYWORD_CLASSIFIER = IntentClassifier(llm_chat_fn=None)
+_PLANNER = TaskPlannerAgent(
+    llm_chat_fn=lambda system, prompt: llm_service.chat(message=prompt, conversation_history=None, system_prompt=system),
+    tools_prompt=tools_prompt(),
+    plan_cache=plan_cache,
+)
+
+
+# 에이전트 LLM 호출의 고정 지시문 (system). 요청마다 바뀌는 관찰/계획은 context 메시지로 따로 보내
+# messages 앞부분이 매 요청 같은 바이트가 되도록 합니다. (제공자 프롬프트 캐시 재사용)
+_FILL_ARGS_SYSTEM = (
+    "당신은 Executor를 돕는 ReAct 서브루틴입니다.\n"
+    "주어진 tool을 실행하기 위한 args만 JSON으로 채우세요. 반드시 JSON만 출력.\n"
+    '반환 형식: {"args":{...}}\n'
+)
+_FINAL_ANSWER_SYSTEM = (
+    "당신은 Assistant입니다. 실행 관찰 결과를 바탕으로 사용자에게 최종 답변을 생성하세요.\n"
+    "불필요한 내부 계획/JSON/디버그를 노출하지 말고, 자연어로 간결하게 답하세요.\n\n"
+    "규칙:\n"
+    "- `rag.query` 관찰에 hits/source가 있으면, 답변 마지막에 **근거(출처)** 를 1~3개 bullet로 반드시 포함하세요.\n"
+    "- 사용자가 '공유/알려줘/슬랙' 등을 요청했고 `notification.send` 관찰이 있으면, '슬랙 공유 완료'를 함께 안내하세요.\n"
+)
+
+
+# 일반 대화(rule-based chat) 폴백의 rag-service 응답 캐시: 정규화된 입력 -> (저장 시각, 응답)
+# 인사/잡담처럼 자주 반복되는 입력은 TTL 안에서 다운스트림 호출 없이 바로 답합니다.
+_FALLBACK_TTL_SECONDS = 300.0
+_FALLBACK_CACHE_SIZE = 512
+_fallback_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_FALLBACK_NORM_RE = re.compile(r"[\s\W_]+")
+
+
+def _fallback_key(message: str) -> str:
+    # 공백/문장부호 차이는 무시 ("안녕!" == "안녕")
+    return _FALLBACK_NORM_RE.sub(" ", message.lower()).strip()
+
+
+def _cached_fallback(message: str) -> Optional[Dict[str, Any]]:
+    key = _fallback_key(message)
+    entry = _fallback_cache.get(key)
+    if entry is None:
+        return None
+    ts, data = entry
+    if time.time() - ts > _FALLBACK_TTL_SECONDS:
+        _fallback_cache.pop(key, None)
+        return None
+    _fallback_cache.move_to_end(key)
+    return data
 
-    tasks: List[str] = []
-    if intent in ("weather_query", "weather"):
-        tasks += ["도시/기간 등 파라미터를 추출한다", "weather-service를 호출해 데이터를 가져온다", "결과를 요약해 답변한다"]
-        if wants_notify:
-            tasks += ["팀에게 전달할 메시지를 구성한다", "notification-service로 발송한다", "발송 결과를 확인한다"]
-        return tasks
-    if intent in ("calendar_query", "calendar"):
-        tasks += ["날짜(오늘/내일/특정일)를 해석한다", "calendar-service를 호출해 일정을 가져온다", "일정/빈시간을 요약한다"]
-        if wants_notify:
-            tasks += ["팀에게 전달할 메시지를 구성한다", "notification-service로 발송한다", "발송 결과를 확인한다"]
-        return tasks
-    if intent in ("calendar_create",):
-        tasks += ["제목/시간/날짜를 추출한다", "calendar-service에 이벤트 생성을 요청한다", "생성 결과를 확인해 사용자에게 안내한다"]
-        if wants_notify:
-            tasks += ["팀에게 전달할 메시지를 구성한다", "notification-service로 발송한다", "발송 결과를 확인한다"]
-        return tasks
-    if intent in ("file_search",):
-        tasks += ["검색 키워드를 정제한다", "file-service를 호출해 검색한다", "상위 결과를 리스트업한다"]
-        if wants_notify:
-            tasks += ["팀에게 전달할 메시지를 구성한다", "notification-service로 발송한다", "발송 결과를 확인한다"]
-        return tasks
-    if intent in ("notification_send", "notify"):
-        return ["채널(email/slack/sms)과 수신자를 결정한다", "notification-service로 발송한다", "발송 결과를 확인한다"]
-    if intent in ("help",):
-        return ["가능한 기능/예시를 정리해서 안내한다"]
-    return ["rag-service(Qdrant)를 질의해 관련 문서를 찾는다", "근거(출처)와 함께 간단히 답한다"]
+
+def _store_fallback(message: str, data: Dict[str, Any]) -> None:
+    key = _fallback_key(message)
+    if not key:
+        return
+    _fallback_cache[key] = (time.time(), data)
+    _fallback_cache.move_to_end(key)
+    while len(_fallback_cache) > _FALLBACK_CACHE_SIZE:
+        _fallback_cache.popitem(last=False)
+
+
+def _classifier() -> IntentClassifier:
+    return _LLM_CLASSIFIER if llm_service.is_enabled() else _KEYWORD_CLASSIFIER
+
+
+@asynccontextmanager
+async def _in_flight(coro):
+    """
+    다운스트림 호출을 먼저 시작해 두고(task), 블록 안에서 SSE 프레임을 내보내는 동안 요청이 진행되게 합니다.
+    블록이 예외/스트림 종료(클라이언트 이탈)로 빠져나가면 호출을 취소합니다.
+    """
+    task = asyncio.ensure_future(coro)
+    try:
+        yield task
+    except BaseException:
+        task.cancel()
+        raise
+
+
+@dataclass
+class _StreamProgress:
+    """
+    룰 기반 스트림 1건의 진행 상태.
+    핸들러마다 반복되던 `completed = min(completed + 1, len(tasks))` + 이벤트 dict 조립을 한곳에 모았습니다.
+    """
+
+    todo: List[str]
+    completed: int = 0
+
+    def status(self, status: str, *, batch: bool = False) -> Dict[str, Any]:
+        ev = {"todo": self.todo, "completed": self.completed, "status": status}
+        if batch:
+            ev["batch"] = True
+        return ev
+
+    def tick(self, status: str, *, batch: bool = False) -> Dict[str, Any]:
+        """한 단계 진행(todo 개수를 넘지 않음)하고 그 상태의 이벤트를 돌려줍니다."""
+        self.completed = min(self.completed + 1, len(self.todo))
+        return self.status(status, batch=batch)
+
+    def finish(self, final: str) -> Dict[str, Any]:
+        self.completed = len(self.todo)
+        return {"todo": self.todo, "completed": self.completed, "status": "완료", "final": final, "done": True}
 
 
 @dataclass
@@ -126,6 +252,7 @@ class ChatService:
     file_base_url: str
     notification_base_url: str
     rag_base_url: str
+    _executor: Optional[ToolExecutor] = field(default=None, init=False, repr=False)
 
     @classmethod
     def from_env(cls) -> "Orchestrator":
@@ -183,8 +310,8 @@ class ChatService:
         else:
             llm_error = None
 
-        classifier = IntentClassifier(llm_chat_fn=llm_service.chat if llm_service.is_enabled() else None)
-        analysis = classifier.analyze_intent(message, context=None)
+        classifier = _classifier()
+        analysis = await classifier.analyze_intent(message, context=None)
         intent = analysis.get("intent", infer_intent(message))
         apis = list(analysis.get("apis") or [])
         wants_notify = "notification" in apis or bool((analysis.get("parameters") or {}).get("notify"))
@@ -214,113 +341,57 @@ class ChatService:
                 "meta": meta,
             }
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            if intent in ("weather", "weather_query"):
-                city = _extract_city(message)
-                r = await client.get(f"{self.weather_base_url}/weather/{city}")
-                r.raise_for_status()
-                data = r.json()
-                meta["weather"] = data
-                weather_summary = f"{data['city']} 현재 날씨는 {data['condition']}, {data['temperature']}°C 입니다."
-
-                # Optional follow-up: notify team (composite request)
-                notify_meta = None
-                if wants_notify:
-                    channel = (
-                        "slack"
-                        if ("슬랙" in message or "slack" in message.lower())
-                        else "email"
-                        if ("이메일" in message or "email" in message.lower() or "메일" in message.lower())
-                        else "sms"
-                        if ("문자" in message or "sms" in message.lower())
-                        else "slack"
-                    )
-                    payload = {
-                        "title": "날씨 알림",
-                        "message": weather_summary,
-                        "recipient": "team",
-                        "channel": channel,
-                    }
-                    nr = await client.post(f"{self.notification_base_url}/notifications/send", json=payload)
-                    nr.raise_for_status()
-                    notify_meta = nr.json()
-                    meta["notification"] = notify_meta
-
-                if wants_notify and notify_meta:
-                    response_text = _with_plan(
-                        f"{weather_summary}\n\n[mock] {notify_meta.get('channel', 'slack')} 알림 발송 완료 (id={notify_meta.get('id')})",
-                        plan,
-                    )
-                else:
-                    response_text = _with_plan(weather_summary, plan)
-
-                context_manager.add_conversation_turn(
-                    session_id=session_id,
-                    user_input=message,
-                    assistant_response=response_text,
-                    intent=intent,
-                    confidence=float(analysis.get("confidence", 0.7)),
-                    apis_used=["weather", "notification"] if wants_notify and notify_meta else ["weather"],
-                    success=True,
-                    processing_time=time.time() - start,
-                    metadata={"tool_result": data, "notification": notify_meta} if notify_meta else {"tool_result": data},
-                )
-                return {"message": response_text, "meta": meta, "conversation_id": session_id}
-
-            if intent in ("calendar", "calendar_query"):
-                endpoint = "/calendar/tomorrow" if "내일" in message else "/calendar/today"
-                r = await client.get(f"{self.calendar_base_url}{endpoint}")
-                r.raise_for_status()
-                data = r.json()
-                meta["calendar"] = data
-                if data.get("total_events", 0) == 0:
-                    response_text = _with_plan(f"{data.get('date')} 일정이 없습니다.", plan)
-                    context_manager.add_conversation_turn(
-                        session_id=session_id,
-                        user_input=message,
-                        assistant_response=response_text,
-                        intent=intent,
-                        confidence=float(analysis.get("confidence", 0.7)),
-                        apis_used=["calendar"],
-                        success=True,
-                        processing_time=time.time() - start,
-                        metadata={"tool_result": data},
-                    )
-                    return {"message": response_text, "meta": meta, "conversation_id": session_id}
-                events = data.get("events", [])
-                lines = [f"- {e.get('start_time')} {e.get('title')}" for e in events[:10]]
-                response_text = _with_plan(
-                    f"{data.get('date')} 일정 {data.get('total_events')}개:\n" + "\n".join(lines),
-                    plan,
-                )
-                context_manager.add_conversation_turn(
-                    session_id=session_id,
-                    user_input=message,
-                    assistant_response=response_text,
-                    intent=intent,
-                    confidence=float(analysis.get("confidence", 0.7)),
-                    apis_used=["calendar"],
-                    success=True,
-                    processing_time=time.time() - start,
-                    metadata={"tool_result": data},
-                )
-                return {"message": response_text, "meta": meta, "conversation_id": session_id}
+        client = self._http_client()  # 요청마다 새로 만들지 않고 커넥션 풀을 공유
+        if intent in ("weather", "weather_query"):
+            city = _extract_city(message)
+            r = await client.get(f"{self.weather_base_url}/weather/{city}")
+            data = decode_json(r)
+            meta["weather"] = data
+            weather_summary = f"{data['city']} 현재 날씨는 {data['condition']}, {data['temperature']}°C 입니다."
+
+            # Optional follow-up: notify team (composite request)
+            notify_meta = None
+            if wants_notify:
+                channel = _detect_channel(message)
+                payload = {
+                    "title": "날씨 알림",
+                    "message": weather_summary,
+                    "recipient": "team",
+                    "channel": channel,
+                }
+                nr = await client.post(f"{self.notification_base_url}/notifications/send", json=payload)
+                notify_meta = decode_json(nr)
+                meta["notification"] = notify_meta
 
-            if intent in ("calendar_create",):
-                title = message
-                for k in ["일정", "회의", "미팅", "잡아줘", "추가해줘", "생성해줘", "만들어줘"]:
-                    title = title.replace(k, "").strip()
-                if not title:
-                    title = "새 일정"
-                payload = {"title": title, "start_time": _extract_time(message)}
-                r = await client.post(f"{self.calendar_base_url}/calendar/events", json=payload)
-                r.raise_for_status()
-                data = r.json()
-                meta["calendar_create"] = data
+            if wants_notify and notify_meta:
                 response_text = _with_plan(
-                    f"일정을 생성했어요: {data.get('start_time')} - {data.get('title')} (id={data.get('id')})",
+                    f"{weather_summary}\n\n[mock] {notify_meta.get('channel', 'slack')} 알림 발송 완료 (id={notify_meta.get('id')})",
                     plan,
                 )
+            else:
+                response_text = _with_plan(weather_summary, plan)
+
+            context_manager.add_conversation_turn(
+                session_id=session_id,
+                user_input=message,
+                assistant_response=response_text,
+                intent=intent,
+                confidence=float(analysis.get("confidence", 0.7)),
+                apis_used=["weather", "notification"] if wants_notify and notify_meta else ["weather"],
+                success=True,
+                processing_time=time.time() - start,
+                metadata={"tool_result": data, "notification": notify_meta} if notify_meta else {"tool_result": data},
+            )
+            return {"message": response_text, "meta": meta, "conversation_id": session_id}
+
+        if intent in ("calendar", "calendar_query"):
+            endpoint = "/calendar/tomorrow" if "내일" in message else "/calendar/today"
+            r = await client.get(f"{self.calendar_base_url}{endpoint}")
+            data = decode_json(r)
+            meta["calendar"] = data
+            # DaySchedule 스키마(date/events/total_events)는 고정이므로 바로 인덱싱합니다.
+            if not data["total_events"]:
+                response_text = _with_plan(f"{data['date']} 일정이 없습니다.", plan)
                 context_manager.add_conversation_turn(
                     session_id=session_id,
                     user_input=message,
@@ -333,34 +404,54 @@ class ChatService:
                     metadata={"tool_result": data},
                 )
                 return {"message": response_text, "meta": meta, "conversation_id": session_id}
-
-            if intent in ("file_search",):
-                r = await client.get(f"{self.file_base_url}/files/search", params={"q": message})
-                r.raise_for_status()
-                data = r.json()
-                meta["file_search"] = data
-                files = data.get("files", [])
-                if not files:
-                    response_text = _with_plan(f"'{message}' 검색 결과가 없습니다.", plan)
-                    context_manager.add_conversation_turn(
-                        session_id=session_id,
-                        user_input=message,
-                        assistant_response=response_text,
-                        intent=intent,
-                        confidence=float(analysis.get("confidence", 0.7)),
-                        apis_used=["file"],
-                        success=True,
-                        processing_time=time.time() - start,
-                        metadata={"tool_result": data},
-                    )
-                    return {"message": response_text, "meta": meta, "conversation_id": session_id}
-                lines = []
-                for f in files[:8]:
-                    lines.append(f"- {f.get('name')} ({f.get('path')})")
-                response_text = _with_plan(
-                    f"검색 결과 {data.get('total_matches')}개:\n" + "\n".join(lines),
-                    plan,
-                )
+            lines = [f"- {e['start_time']} {e['title']}" for e in data["events"][:10]]
+            response_text = _with_plan(
+                f"{data['date']} 일정 {data['total_events']}개:\n" + "\n".join(lines),
+                plan,
+            )
+            context_manager.add_conversation_turn(
+                session_id=session_id,
+                user_input=message,
+                assistant_response=response_text,
+                intent=intent,
+                confidence=float(analysis.get("confidence", 0.7)),
+                apis_used=["calendar"],
+                success=True,
+                processing_time=time.time() - start,
+                metadata={"tool_result": data},
+            )
+            return {"message": response_text, "meta": meta, "conversation_id": session_id}
+
+        if intent in ("calendar_create",):
+            title = _extract_title(message)
+            payload = {"title": title, "start_time": _extract_time(message)}
+            r = await client.post(f"{self.calendar_base_url}/calendar/events", json=payload)
+            data = decode_json(r)
+            meta["calendar_create"] = data
+            response_text = _with_plan(
+                f"일정을 생성했어요: {data['start_time']} - {data['title']} (id={data.get('id')})",
+                plan,
+            )
+            context_manager.add_conversation_turn(
+                session_id=session_id,
+                user_input=message,
+                assistant_response=response_text,
+                intent=intent,
+                confidence=float(analysis.get("confidence", 0.7)),
+                apis_used=["calendar"],
+                success=True,
+                processing_time=time.time() - start,
+                metadata={"tool_result": data},
+            )
+            return {"message": response_text, "meta": meta, "conversation_id": session_id}
+
+        if intent in ("file_search",):
+            r = await client.get(f"{self.file_base_url}/files/search", params={"q": message})
+            data = decode_json(r)
+            meta["file_search"] = data
+            files = data["files"]  # SearchResult 스키마(files/total_matches) 고정
+            if not files:
+                response_text = _with_plan(f"'{message}' 검색 결과가 없습니다.", plan)
                 context_manager.add_conversation_turn(
                     session_id=session_id,
                     user_input=message,
@@ -373,60 +464,78 @@ class ChatService:
                     metadata={"tool_result": data},
                 )
                 return {"message": response_text, "meta": meta, "conversation_id": session_id}
+            lines = [f"- {f['name']} ({f['path']})" for f in files[:8]]
+            response_text = _with_plan(
+                f"검색 결과 {data['total_matches']}개:\n" + "\n".join(lines),
+                plan,
+            )
+            context_manager.add_conversation_turn(
+                session_id=session_id,
+                user_input=message,
+                assistant_response=response_text,
+                intent=intent,
+                confidence=float(analysis.get("confidence", 0.7)),
+                apis_used=["file"],
+                success=True,
+                processing_time=time.time() - start,
+                metadata={"tool_result": data},
+            )
+            return {"message": response_text, "meta": meta, "conversation_id": session_id}
+
+        if intent in ("notify", "notification_send"):
+            channel = _detect_channel(message)
+            payload = {"title": "알림", "message": message, "recipient": "team", "channel": channel}
+            r = await client.post(f"{self.notification_base_url}/notifications/send", json=payload)
+            data = decode_json(r)
+            meta["notification"] = data
+            response_text = _with_plan(f"[mock] {channel} 알림 발송 완료 (id={data.get('id')})", plan)
+            context_manager.add_conversation_turn(
+                session_id=session_id,
+                user_input=message,
+                assistant_response=response_text,
+                intent=intent,
+                confidence=float(analysis.get("confidence", 0.7)),
+                apis_used=["notification"],
+                success=True,
+                processing_time=time.time() - start,
+                metadata={"tool_result": data},
+            )
+            return {"message": response_text, "meta": meta, "conversation_id": session_id}
 
-            if intent in ("notify", "notification_send"):
-                channel = "slack" if ("슬랙" in message or "slack" in message.lower()) else "email" if ("이메일" in message or "email" in message.lower()) else "sms" if ("문자" in message or "sms" in message.lower()) else "slack"
-                payload = {"title": "알림", "message": message, "recipient": "team", "channel": channel}
-                r = await client.post(f"{self.notification_base_url}/notifications/send", json=payload)
-                r.raise_for_status()
-                data = r.json()
-                meta["notification"] = data
-                response_text = _with_plan(f"[mock] {channel} 알림 발송 완료 (id={data.get('id')})", plan)
-                context_manager.add_conversation_turn(
-                    session_id=session_id,
-                    user_input=message,
-                    assistant_response=response_text,
-                    intent=intent,
-                    confidence=float(analysis.get("confidence", 0.7)),
-                    apis_used=["notification"],
-                    success=True,
-                    processing_time=time.time() - start,
-                    metadata={"tool_result": data},
-                )
-                return {"message": response_text, "meta": meta, "conversation_id": session_id}
-
-            # RAG fallback for general chat/questions (uses Qdrant-backed rag-service)
-            if intent in ("chat",):
-                try:
+        # RAG fallback for general chat/questions (uses Qdrant-backed rag-service)
+        if intent in ("chat",):
+            try:
+                data = _cached_fallback(message)
+                if data is None:
                     r = await client.post(f"{self.rag_base_url}/rag/query", json={"query": message, "top_k": 5})
-                    r.raise_for_status()
-                    data = r.json()
-                    meta["rag"] = data
-                    hits = data.get("hits", [])
-                    if hits:
-                        top = hits[0]
-                        response_text = _with_plan(
-                            f"관련 문서 기반 답변(Top1):\n- {top.get('text','')}\n(출처: {top.get('source','')})",
-                            plan,
-                        )
-                    else:
-                        response_text = _with_plan("관련 문서를 찾지 못했어요.", plan)
-                except Exception as e:
-                    meta["rag_error"] = str(e)
-                    response_text = _with_plan(message, plan)
-
-                context_manager.add_conversation_turn(
-                    session_id=session_id,
-                    user_input=message,
-                    assistant_response=response_text,
-                    intent=intent,
-                    confidence=float(analysis.get("confidence", 0.7)),
-                    apis_used=["rag"] if "rag" in meta else [],
-                    success=True,
-                    processing_time=time.time() - start,
-                    metadata={},
-                )
-                return {"message": response_text, "meta": meta, "conversation_id": session_id}
+                    data = decode_json(r)
+                    _store_fallback(message, data)
+                meta["rag"] = data
+                hits = data.get("hits", [])
+                if hits:
+                    top = hits[0]
+                    response_text = _with_plan(
+                        f"관련 문서 기반 답변(Top1):\n- {top.get('text','')}\n(출처: {top.get('source','')})",
+                        plan,
+                    )
+                else:
+                    response_text = _with_plan("관련 문서를 찾지 못했어요.", plan)
+            except Exception as e:
+                meta["rag_error"] = str(e)
+                response_text = _with_plan(message, plan)
+
+            context_manager.add_conversation_turn(
+                session_id=session_id,
+                user_input=message,
+                assistant_response=response_text,
+                intent=intent,
+                confidence=float(analysis.get("confidence", 0.7)),
+                apis_used=["rag"] if "rag" in meta else [],
+                success=True,
+                processing_time=time.time() - start,
+                metadata={},
+            )
+            return {"message": response_text, "meta": meta, "conversation_id": session_id}
 
         # Fallback
         response_text = _with_plan(message, plan)
@@ -445,86 +554,52 @@ class ChatService:
 
     # ---------------- Agentic internals (keep orchestrator as the single runtime) ----------------
     def _agentic_executor(self) -> ToolExecutor:
-        return ToolExecutor(
-            weather_base_url=self.weather_base_url,
-            calendar_base_url=self.calendar_base_url,
-            file_base_url=self.file_base_url,
-            notification_base_url=self.notification_base_url,
-            rag_base_url=self.rag_base_url,
-            tools=tool_defs(),
-        )
+        # 실행기는 내부에 커넥션 풀(httpx.AsyncClient)을 들고 있으므로 요청마다 새로 만들지 않고 재사용합니다.
+        if self._executor is None:
+            self._executor = ToolExecutor(
+                weather_base_url=self.weather_base_url,
+                calendar_base_url=self.calendar_base_url,
+                file_base_url=self.file_base_url,
+                notification_base_url=self.notification_base_url,
+                rag_base_url=self.rag_base_url,
+                tools=tool_defs(),
+            )
+        return self._executor
 
-    @staticmethod
-    def _agentic_extract_json_object(text: str) -> Dict[str, Any]:
-        import json as _json
+    def _http_client(self) -> httpx.AsyncClient:
+        # 룰 기반 경로도 실행기와 같은 커넥션 풀(keep-alive, HTTP/2 가능 시)을 씁니다.
+        return self._agentic_executor().client
 
-        if not text:
-            return {}
-        text = text.strip()
-        try:
-            obj = _json.loads(text)
-            return obj if isinstance(obj, dict) else {}
-        except Exception:
-            pass
-        try:
-            start = text.find("{")
-            end = text.rfind("}")
-            if start >= 0 and end > start:
-                obj = _json.loads(text[start : end + 1])
-                return obj if isinstance(obj, dict) else {}
-        except Exception:
-            return {}
-        return {}
+    async def aclose(self) -> None:
+        if self._executor is not None:
+            await self._executor.aclose()
+            self._executor = None
 
-    def _agentic_fill_args_prompt(
+    # 플래너와 같은 파서를 공유합니다.
+    _agentic_extract_json_object = staticmethod(extract_json_object)
+
+    def _agentic_fill_args_context(
         self,
         *,
-        user_input: str,
         tool: str,
         args_schema: Dict[str, Any],
         recent_turns: List[Dict[str, Any]],
         observations: List[Dict[str, Any]],
     ) -> str:
-        import json as _json
-
-        def _safe(x, limit=800):
-            try:
-                s = _json.dumps(x, ensure_ascii=False)
-            except Exception:
-                s = str(x)
-            return s if len(s) <= limit else (s[:limit] + "…")
-
+        """fill_args 호출의 동적 context (고정 지시문은 _FILL_ARGS_SYSTEM)."""
         return (
-            "당신은 Executor를 돕는 ReAct 서브루틴입니다.\n"
-            "주어진 tool을 실행하기 위한 args만 JSON으로 채우세요. 반드시 JSON만 출력.\n\n"
             f"tool: {tool}\n"
             f"args_schema: {args_schema}\n"
-            f"최근 대화(참고): {_safe(recent_turns)}\n\n"
-            f"이전 관찰(observations, 참고): {_safe(observations)}\n\n"
-            f"사용자 요청: {user_input}\n"
-            '반환 형식: {"args":{...}}\n'
+            f"최근 대화(참고): {safe_str(recent_turns, 800)}\n\n"
+            f"이전 관찰(observations, 참고): {safe_str(observations, 800)}\n"
         )
 
-    def _agentic_final_answer_prompt(self, *, user_input: str, intent: str, tasks: List[Dict[str, Any]], observations: List[Dict[str, Any]]) -> str:
-        import json as _json
-
-        def _safe(x, limit=1600):
-            try:
-                s = _json.dumps(x, ensure_ascii=False)
-            except Exception:
-                s = str(x)
-            return s if len(s) <= limit else (s[:limit] + "…")
-
+    def _agentic_final_answer_context(self, *, intent: str, tasks: List[Dict[str, Any]], observations: List[Dict[str, Any]]) -> str:
+        """최종 답변 호출의 동적 context (고정 지시문은 _FINAL_ANSWER_SYSTEM)."""
         return (
-            "당신은 Assistant입니다. 실행 관찰 결과를 바탕으로 사용자에게 최종 답변을 생성하세요.\n"
-            "불필요한 내부 계획/JSON/디버그를 노출하지 말고, 자연어로 간결하게 답하세요.\n\n"
-            "규칙:\n"
-            "- `rag.query` 관찰에 hits/source가 있으면, 답변 마지막에 **근거(출처)** 를 1~3개 bullet로 반드시 포함하세요.\n"
-            "- 사용자가 '공유/알려줘/슬랙' 등을 요청했고 `notification.send` 관찰이 있으면, '슬랙 공유 완료'를 함께 안내하세요.\n\n"
             f"Intent: {intent}\n"
-            f"사용자 요청: {user_input}\n\n"
-            f"계획(tasks): {_safe(tasks, 1200)}\n\n"
-            f"관찰(observations): {_safe(observations, 1800)}\n"
+            f"계획(tasks): {safe_str(tasks, 1200)}\n\n"
+            f"관찰(observations): {safe_str(observations, 1800)}\n"
         )
 
     @staticmethod
@@ -637,18 +712,14 @@ class ChatService:
         recent_turns = context_manager.get_recent_turns(session_id, n=5)
 
         # 1) lightweight intent classification
-        cls = IntentClassifier(llm_chat_fn=llm_service.chat)
-        analysis = cls.analyze_intent(message, context=None)
+        analysis = await _LLM_CLASSIFIER.analyze_intent(message, context=None)
         intent = str(analysis.get("intent") or "chat")
         apis = list(analysis.get("apis") or [])
         confidence = float(analysis.get("confidence") or 0.7)
 
         # 2) LLM plan/replan
-        planner = TaskPlannerAgent(
-            llm_chat_fn=lambda prompt: llm_service.chat(message=prompt, conversation_history=None),
-            tools_prompt=tools_prompt(),
-        )
-        plan_obj = planner.plan(user_input=message, intent=intent, apis=apis, recent_turns=recent_turns)
+        planner = _PLANNER
+        plan_obj = await planner.plan(user_input=message, intent=intent, apis=apis, recent_turns=recent_turns)
         tasks = plan_obj.get("tasks") if isinstance(plan_obj.get("tasks"), list) else []
         if not tasks:
             tasks = [{"id": "t1", "text": "요청을 처리한다", "tool": "none", "args": {}, "depends_on": [], "produces": "final"}]
@@ -675,23 +746,24 @@ class ChatService:
         # 3) execute with cache + replans
         executor = self._agentic_executor()
 
-        def fill_args(tool: str, schema: Dict[str, Any], observations: List[Dict[str, Any]]) -> Dict[str, Any]:
+        async def fill_args(tool: str, schema: Dict[str, Any], observations: List[Dict[str, Any]]) -> Dict[str, Any]:
             filled = self._agentic_extract_json_object(
-                llm_service.chat(
-                    message=self._agentic_fill_args_prompt(
-                        user_input=message,
+                await llm_service.chat(
+                    message=f"사용자 요청: {message}",
+                    conversation_history=None,
+                    system_prompt=_FILL_ARGS_SYSTEM,
+                    context=self._agentic_fill_args_context(
                         tool=tool,
                         args_schema=schema,
                         recent_turns=recent_turns,
                         observations=observations,
                     ),
-                    conversation_history=None,
                 )
             )
             return filled.get("args") if isinstance(filled.get("args"), dict) else {}
 
-        def replan(current_tasks: List[Dict[str, Any]], observations: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
-            rp = planner.replan(user_input=message, intent=intent, apis=apis, current_tasks=current_tasks, observations=observations)
+        async def replan(current_tasks: List[Dict[str, Any]], observations: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+            rp = await planner.replan(user_input=message, intent=intent, apis=apis, current_tasks=current_tasks, observations=observations)
             new_tasks = rp.get("tasks") if isinstance(rp.get("tasks"), list) else None
             return self._agentic_topo_sort(new_tasks) if new_tasks else None
 
@@ -705,9 +777,11 @@ class ChatService:
 
         # 4) final answer
         final_text = str(
-            llm_service.chat(
-                message=self._agentic_final_answer_prompt(user_input=message, intent=intent, tasks=final_tasks, observations=observations),
+            await llm_service.chat(
+                message=f"사용자 요청: {message}",
                 conversation_history=None,
+                system_prompt=_FINAL_ANSWER_SYSTEM,
+                context=self._agentic_final_answer_context(intent=intent, tasks=final_tasks, observations=observations),
             )
             or ""
         ).strip()
@@ -728,7 +802,8 @@ class ChatService:
     async def stream(self, *, message: str, conversation_id: Optional[str] = None, conversation_history: Optional[List[ChatMessage]] = None):
         """
         Yields event dicts:
-        - {todo: list[str], completed: int, status: str, final?: str, done?: bool}
+        - {todo: list[str], completed: int, status: str, final?: str, done?: bool, batch?: bool}
+        - batch=True: I/O 없이 바로 다음 이벤트가 이어짐 -> API 계층이 다음 프레임과 묶어 한 번에 보내도 됨
         """
         session_id = get_or_create_session(conversation_id)
 
@@ -738,16 +813,13 @@ class ChatService:
                 recent_turns = context_manager.get_recent_turns(session_id, n=5)
                 yield {"todo": [], "completed": 0, "status": "의도 분석 중..."}
 
-                analysis = IntentClassifier(llm_chat_fn=llm_service.chat if llm_service.is_enabled() else None).analyze_intent(message, context=None)
+                analysis = await _classifier().analyze_intent(message, context=None)
                 intent = str(analysis.get("intent") or "chat")
                 apis = list(analysis.get("apis") or [])
 
                 yield {"todo": [], "completed": 0, "status": "계획 수립 중..."}
-                planner = TaskPlannerAgent(
-                    llm_chat_fn=lambda prompt: llm_service.chat(message=prompt, conversation_history=None),
-                    tools_prompt=tools_prompt(),
-                )
-                plan_obj = planner.plan(user_input=message, intent=intent, apis=apis, recent_turns=recent_turns)
+                planner = _PLANNER
+                plan_obj = await planner.plan(user_input=message, intent=intent, apis=apis, recent_turns=recent_turns)
                 tasks = plan_obj.get("tasks") if isinstance(plan_obj.get("tasks"), list) else []
                 if not tasks:
                     tasks = [{"id": "t1", "text": "요청을 처리한다", "tool": "none", "args": {}, "depends_on": [], "produces": "final"}]
@@ -773,23 +845,24 @@ class ChatService:
 
                 executor = self._agentic_executor()
 
-                def fill_args(tool: str, schema: Dict[str, Any], observations: List[Dict[str, Any]]) -> Dict[str, Any]:
+                async def fill_args(tool: str, schema: Dict[str, Any], observations: List[Dict[str, Any]]) -> Dict[str, Any]:
                     filled = self._agentic_extract_json_object(
-                        llm_service.chat(
-                            message=self._agentic_fill_args_prompt(
-                                user_input=message,
+                        await llm_service.chat(
+                            message=f"사용자 요청: {message}",
+                            conversation_history=None,
+                            system_prompt=_FILL_ARGS_SYSTEM,
+                            context=self._agentic_fill_args_context(
                                 tool=tool,
                                 args_schema=schema,
                                 recent_turns=recent_turns,
                                 observations=observations,
                             ),
-                            conversation_history=None,
                         )
                     )
                     return filled.get("args") if isinstance(filled.get("args"), dict) else {}
 
-                def replan(current_tasks: List[Dict[str, Any]], observations: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
-                    rp = planner.replan(user_input=message, intent=intent, apis=apis, current_tasks=current_tasks, observations=observations)
+                async def replan(current_tasks: List[Dict[str, Any]], observations: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+                    rp = await planner.replan(user_input=message, intent=intent, apis=apis, current_tasks=current_tasks, observations=observations)
                     new_tasks = rp.get("tasks") if isinstance(rp.get("tasks"), list) else None
                     return self._agentic_topo_sort(new_tasks) if new_tasks else None
 
@@ -802,21 +875,26 @@ class ChatService:
                 )
 
                 # Stream the final answer itself (not only status)
-                prompt = self._agentic_final_answer_prompt(user_input=message, intent=intent, tasks=final_tasks, observations=observations)
+                answer_context = self._agentic_final_answer_context(intent=intent, tasks=final_tasks, observations=observations)
                 buf = ""
                 last_emit_len = 0
-                last_emit_t = time.time()
+                last_emit_t = time.monotonic()
                 yield {"todo": todo, "completed": len(todo), "status": "답변 생성 중...", "partial": ""}
 
                 # Emit much more frequently so the UI feels like real streaming.
                 # (Still lightly throttled to avoid flooding the UI.)
-                for chunk in llm_service.stream_chat(message=prompt, conversation_history=None):
+                async for chunk in llm_service.stream_chat(
+                    message=f"사용자 요청: {message}",
+                    conversation_history=None,
+                    system_prompt=_FINAL_ANSWER_SYSTEM,
+                    context=answer_context,
+                ):
                     buf += str(chunk or "")
                     # flush at least every ~0.12s or every ~12 chars (whichever comes first)
-                    if (len(buf) - last_emit_len) >= 12 or (time.time() - last_emit_t) >= 0.12:
+                    if (len(buf) - last_emit_len) >= 12 or (time.monotonic() - last_emit_t) >= 0.12:
                         yield {"todo": todo, "completed": len(todo), "status": "답변 생성 중...", "partial": buf}
                         last_emit_len = len(buf)
-                        last_emit_t = time.time()
+                        last_emit_t = time.monotonic()
 
                 # final flush (in case throttling prevented last few chars from emitting)
                 if len(buf) != last_emit_len:
@@ -830,8 +908,8 @@ class ChatService:
                 yield {"todo": [], "completed": 0, "status": "LLM 오류로 rule-based로 전환"}
 
         # Rule-based structured stream (existing behavior moved from api/chat.py)
-        classifier = IntentClassifier(llm_chat_fn=llm_service.chat if llm_service.is_enabled() else None)
-        analysis = classifier.analyze_intent(message, context=None)
+        classifier = _classifier()
+        analysis = await classifier.analyze_intent(message, context=None)
         intent = analysis.get("intent", infer_intent(message))
         apis = list(analysis.get("apis") or [])
         wants_notify = "notification" in apis or bool((analysis.get("parameters") or {}).get("notify"))
@@ -839,107 +917,97 @@ class ChatService:
         plan = {"tasks": _rule_todo_list(message, analysis), "intent": intent, "apis": apis}
         tasks = plan.get("tasks") or []
 
-        # Emit initial state
-        yield {"todo": tasks, "completed": 0, "status": "계획 수립 중..."}
-        yield {"todo": tasks, "completed": 0, "status": "의도 분석 완료"}
-
-        completed = 0
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            # weather
-            if intent in ("weather", "weather_query"):
-                city = _extract_city(message)
-                completed = min(completed + 1, len(tasks))
-                yield {"todo": tasks, "completed": completed, "status": "파라미터 추출 완료"}
-
-                completed = min(completed + 1, len(tasks))
-                yield {"todo": tasks, "completed": completed, "status": "weather-service 호출 중..."}
-                r = await client.get(f"{self.weather_base_url}/weather/{city}")
-                r.raise_for_status()
-                data = r.json()
-                weather_summary = f"{data['city']} 현재 날씨는 {data['condition']}, {data['temperature']}°C 입니다."
-
-                completed = min(completed + 1, len(tasks))
-                if wants_notify:
-                    yield {"todo": tasks, "completed": completed, "status": "결과 요약 완료"}
-                    completed = min(completed + 1, len(tasks))
-                    yield {"todo": tasks, "completed": completed, "status": "notification-service 발송 중..."}
-                    channel = (
-                        "slack"
-                        if ("슬랙" in message or "slack" in message.lower())
-                        else "email"
-                        if ("이메일" in message or "email" in message.lower() or "메일" in message.lower())
-                        else "sms"
-                        if ("문자" in message or "sms" in message.lower())
-                        else "slack"
-                    )
-                    payload = {"title": "날씨 알림", "message": weather_summary, "recipient": "team", "channel": channel}
-                    nr = await client.post(f"{self.notification_base_url}/notifications/send", json=payload)
-                    nr.raise_for_status()
-                    notify_meta = nr.json()
-                    completed = min(completed + 1, len(tasks))
-                    yield {"todo": tasks, "completed": completed, "status": "발송 결과 확인 완료"}
-                    final = f"{weather_summary}\n\n[mock] {notify_meta.get('channel', channel)} 알림 발송 완료 (id={notify_meta.get('id')})"
-                else:
-                    final = weather_summary
-
-                yield {"todo": tasks, "completed": completed, "status": "완료", "final": final, "done": True}
-                return
+        progress = _StreamProgress(tasks)
 
-            # notify only
-            if intent in ("notify", "notification_send"):
-                completed = min(completed + 1, len(tasks))
-                yield {"todo": tasks, "completed": completed, "status": "채널/수신자 결정 완료"}
-                channel = (
-                    "slack"
-                    if ("슬랙" in message or "slack" in message.lower())
-                    else "email"
-                    if ("이메일" in message or "email" in message.lower() or "메일" in message.lower())
-                    else "sms"
-                    if ("문자" in message or "sms" in message.lower())
-                    else "slack"
-                )
-                payload = {"title": "알림", "message": message, "recipient": "team", "channel": channel}
-                completed = min(completed + 1, len(tasks))
-                yield {"todo": tasks, "completed": completed, "status": "notification-service 발송 중..."}
-                r = await client.post(f"{self.notification_base_url}/notifications/send", json=payload)
-                r.raise_for_status()
-                data = r.json()
-                completed = min(completed + 1, len(tasks))
-                final = f"[mock] {channel} 알림 발송 완료 (id={data.get('id')})"
-                yield {"todo": tasks, "completed": completed, "status": "완료", "final": final, "done": True}
-                return
+        # Emit initial state
+        yield progress.status("계획 수립 중...", batch=True)
+        yield progress.status("의도 분석 완료", batch=True)
 
-        # fallback
-        # If it's general chat, do a minimal RAG-backed answer (so fallback isn't a raw echo)
-        if intent in ("chat",):
-            try:
-                completed = min(completed + 1, len(tasks))
-                yield {"todo": tasks, "completed": completed, "status": "rag-service 호출 중..."}
-                r = await client.post(f"{self.rag_base_url}/rag/query", json={"query": message, "top_k": 5})
-                r.raise_for_status()
-                data = r.json()
-                hits = data.get("hits") or []
-                if hits:
-                    lines = []
-                    sources = []
-                    for h in hits[:3]:
-                        if isinstance(h, dict):
-                            src = str(h.get("source") or "").strip()
-                            if src and src not in sources:
-                                sources.append(src)
-                    top_text = str(hits[0].get("text") or "") if isinstance(hits[0], dict) else ""
-                    final = f"{top_text}".strip() or "관련 문서를 찾았지만 요약에 실패했어요."
-                    if sources:
-                        final += "\n\n근거(출처)\n" + "\n".join([f"- {s}" for s in sources])
-                else:
-                    final = "관련 문서를 찾지 못했어요."
-            except Exception:
-                final = message
-            yield {"todo": tasks, "completed": len(tasks), "status": "완료", "final": final, "done": True}
+        handler = _RULE_STREAMS.get(intent)
+        if handler is None:
+            yield progress.finish(message)
             return
+        # 핸들러가 중간에 닫혀도(클라이언트 이탈) 진행 중인 호출이 정리되도록 aclosing으로 감쌉니다.
+        async with aclosing(handler(self, message=message, progress=progress, wants_notify=wants_notify)) as events:
+            async for ev in events:
+                yield ev
+
+    # ---- Rule-based stream handlers (intent -> async generator, _RULE_STREAMS로 디스패치) ----
+    async def _stream_weather(self, *, message: str, progress: _StreamProgress, wants_notify: bool):
+        client = self._http_client()  # 요청마다 새로 만들지 않고 커넥션 풀을 공유
+        city = _extract_city(message)
+        yield progress.tick("파라미터 추출 완료", batch=True)
+
+        async with _in_flight(client.get(f"{self.weather_base_url}/weather/{city}")) as call:
+            yield progress.tick("weather-service 호출 중...")
+            r = await call
+        data = decode_json(r)
+        weather_summary = f"{data['city']} 현재 날씨는 {data['condition']}, {data['temperature']}°C 입니다."
 
-        yield {"todo": tasks, "completed": len(tasks), "status": "완료", "final": message, "done": True}
-
+        if wants_notify:
+            yield progress.tick("결과 요약 완료", batch=True)
+            channel = _detect_channel(message)
+            payload = {"title": "날씨 알림", "message": weather_summary, "recipient": "team", "channel": channel}
+            async with _in_flight(client.post(f"{self.notification_base_url}/notifications/send", json=payload)) as call:
+                yield progress.tick("notification-service 발송 중...")
+                nr = await call
+            notify_meta = decode_json(nr)
+            yield progress.tick("발송 결과 확인 완료", batch=True)
+            final = f"{weather_summary}\n\n[mock] {notify_meta.get('channel', channel)} 알림 발송 완료 (id={notify_meta.get('id')})"
+        else:
+            final = weather_summary
+
+        yield progress.finish(final)
+
+    async def _stream_notify(self, *, message: str, progress: _StreamProgress, wants_notify: bool):
+        client = self._http_client()
+        yield progress.tick("채널/수신자 결정 완료", batch=True)
+        channel = _detect_channel(message)
+        payload = {"title": "알림", "message": message, "recipient": "team", "channel": channel}
+        async with _in_flight(client.post(f"{self.notification_base_url}/notifications/send", json=payload)) as call:
+            yield progress.tick("notification-service 발송 중...")
+            r = await call
+        data = decode_json(r)
+        yield progress.finish(f"[mock] {channel} 알림 발송 완료 (id={data.get('id')})")
+
+    async def _stream_chat(self, *, message: str, progress: _StreamProgress, wants_notify: bool):
+        # If it's general chat, do a minimal RAG-backed answer (so fallback isn't a raw echo)
+        client = self._http_client()
+        try:
+            data = _cached_fallback(message)
+            if data is None:
+                async with _in_flight(client.post(f"{self.rag_base_url}/rag/query", json={"query": message, "top_k": 5})) as call:
+                    yield progress.tick("rag-service 호출 중...")
+                    r = await call
+                data = decode_json(r)
+                _store_fallback(message, data)
+            hits = data.get("hits") or []
+            if hits:
+                sources = []
+                for h in hits[:3]:
+                    if isinstance(h, dict):
+                        src = str(h.get("source") or "").strip()
+                        if src and src not in sources:
+                            sources.append(src)
+                top_text = str(hits[0].get("text") or "") if isinstance(hits[0], dict) else ""
+                final = f"{top_text}".strip() or "관련 문서를 찾았지만 요약에 실패했어요."
+                if sources:
+                    final += "\n\n근거(출처)\n" + "\n".join([f"- {s}" for s in sources])
+            else:
+                final = "관련 문서를 찾지 못했어요."
+        except Exception:
+            final = message
+        yield progress.finish(final)
+
+
+# intent(및 별칭) -> 룰 기반 스트림 핸들러. 목록에 없는 intent는 입력을 그대로 돌려주고 끝냅니다.
+_RULE_STREAMS = {
+    "weather": ChatService._stream_weather,
+    "weather_query": ChatService._stream_weather,
+    "notify": ChatService._stream_notify,
+    "notification_send": ChatService._stream_notify,
+    "chat": ChatService._stream_chat,
+}
 
 chat_service = ChatService.from_env()
 
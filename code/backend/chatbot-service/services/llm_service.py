@@ -1,65 +1,311 @@
 """
 OpenAI 및 Azure OpenAI API 호출을 처리하는 LLM 서비스.
 """
-from typing import List, Optional
-from openai import OpenAI, AzureOpenAI
-from config import llm_config
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from functools import cache, cached_property, partial
+from typing import Any, AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import httpx
+from openai import AsyncAzureOpenAI, AsyncOpenAI
+from config import get_llm_config
 from models import ChatMessage
+from services.semantic_cache import SemanticCache
+
+try:  # optional: orjson - 있으면 캐시 키용 messages 직렬화를 C로 처리
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:  # optional: opentelemetry-api - 있으면 제공자 호출마다 span(모델/토큰/지연)을 남김
+    from opentelemetry import trace
+    from opentelemetry.trace import Status, StatusCode
+    _tracer = trace.get_tracer(__name__)
+except ImportError:  # pragma: no cover
+    _tracer = None
+
+try:  # optional: h2 (httpx[http2]) - 없으면 HTTP/1.1 keep-alive 풀만 사용
+    import h2
+except ImportError:  # pragma: no cover
+    h2 = None
+
+
+_MOCK_REPLY = "현재 LLM이 설정되지 않아(mock) 마이크로서비스 오케스트레이터로 처리합니다."
+
+
+class _ClientSettings(NamedTuple):
+    """
+    첫 사용 때 한 번 정해지는 제공자/클라이언트 설정.
+    create: model(azure는 deployment 이름)/temperature/max_tokens를 미리 묶어 둔
+    client.chat.completions.create (mock이면 None). 호출 측은 messages(와 stream)만 넘깁니다.
+    semantic_cache: SEMANTIC_CACHE_ENABLED일 때 같은 클라이언트의 임베딩으로 만든 응답 캐시.
+    deterministic: temperature가 0이면 True (같은 messages -> 같은 응답이므로 정확 일치 캐시를 씀).
+    """
+    provider: str
+    client: Any = None
+    create: Optional[Callable[..., Any]] = None
+    semantic_cache: Optional[SemanticCache] = None
+    deterministic: bool = False
+
+
+_MOCK_SETTINGS = _ClientSettings(provider="mock")
+
+# 프롬프트에 싣는 이전 대화의 최대 메시지 수 (최근 3턴 = user/assistant 6개).
+# 긴 세션에서도 요청 크기/변환 비용이 일정하도록 오래된 턴은 잘라내고, 요약(재작성)은 하지 않습니다.
+_HISTORY_WINDOW_MESSAGES = 6
+
+# temperature 0일 때 쓰는 정확 일치 응답 캐시의 최대 항목 수 (LRU)
+_EXACT_CACHE_SIZE = 1024
+
+# stream_chat이 토큰 조각을 모아 한 번에 내보내는 최대 길이 (chat_service는 ~12자/0.12초마다 UI를 갱신)
+_STREAM_BATCH_MAX_CHARS = 32
+# 모은 조각이 이 시간(초) 넘게 묶여 있었거나 줄바꿈이 오면 크기와 상관없이 바로 내보냄
+_STREAM_FLUSH_INTERVAL = 0.05
+
+
+@cache
+def _shared_http_client() -> httpx.AsyncClient:
+    """
+    OpenAI/Azure SDK가 함께 쓰는 프로세스 단위 (비동기) HTTP 클라이언트.
+    SDK 인스턴스마다 따로 풀을 만들지 않고 TCP/TLS 연결을 keep-alive로 재사용하며,
+    h2가 있으면 HTTP/2로 협상해 짧은 요청들이 한 연결을 나눠 씁니다.
+    LLM 호출은 응답이 길어 연결을 오래 붙잡으므로 풀 상한을 넉넉히 둡니다. (상한에 걸리면 대기열이 생김)
+    """
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=100, keepalive_expiry=30.0),
+        http2=h2 is not None,
+        timeout=httpx.Timeout(60.0, connect=5.0),
+    )
+
+
+def _semantic_cache_for(client: Any, embedding_model: str) -> Optional[SemanticCache]:
+    """client.embeddings로 임베딩하는 SemanticCache (임베딩 모델/배포 이름이 없으면 None)."""
+    if not embedding_model:
+        return None
+
+    async def embed(text: str) -> List[float]:
+        response = await client.embeddings.create(model=embedding_model, input=text)
+        return response.data[0].embedding
+
+    return SemanticCache(embed)
+
+
+def _slices(text: str) -> Tuple[str, ...]:
+    # 이미 완성된 응답(mock/캐시)은 잘게 쪼갤 이유가 없음 (yield/프레임 수를 줄임)
+    # 512자 이하면 원본 문자열 하나를 그대로 담습니다. (복사 없음)
+    return (text,) if len(text) <= 512 else tuple(text[i : i + 512] for i in range(0, len(text), 512))
+
+
+# mock 응답은 고정이므로 청크도 import 시 한 번만 만들어 둡니다.
+_MOCK_CHUNKS = _slices(_MOCK_REPLY)
+
+
+def _exact_key(create: Callable[..., Any], messages: List[dict]) -> str:
+    """create에 묶인 model/temperature/max_tokens + messages의 안정적인 해시."""
+    key_parts = [getattr(create, "keywords", None), messages]
+    if orjson is not None:
+        # 관찰/계획이 들어간 긴 messages도 중간 str 없이 바로 bytes로 직렬화
+        payload = orjson.dumps(key_parts)
+    else:
+        payload = json.dumps(key_parts, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+async def _aclose_stream(stream: Any) -> None:
+    """제공자 스트림의 HTTP 응답을 닫아 남은 토큰 수신을 멈추고 연결을 풀에 돌려줍니다."""
+    close = getattr(stream, "close", None)  # 최신 SDK의 AsyncStream.close()
+    if close is not None:
+        await close()
+        return
+    response = getattr(stream, "response", None)  # openai==1.3.7: httpx.Response만 노출
+    if response is not None:
+        await response.aclose()
+
+
+def _span_attributes(provider: str, create: Callable[..., Any]) -> Dict[str, Any]:
+    return {"llm.provider": provider, "llm.model": str((getattr(create, "keywords", None) or {}).get("model", ""))}
+
+
+def _chat_span(provider: str, create: Callable[..., Any]) -> Any:
+    """chat 호출 span (예외는 start_as_current_span이 기록). opentelemetry가 없으면 None을 주는 nullcontext."""
+    if _tracer is None:
+        return nullcontext()
+    return _tracer.start_as_current_span("llm.chat", attributes=_span_attributes(provider, create))
+
+
+def _record_usage(span: Any, response: Any) -> None:
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        span.set_attribute("llm.prompt_tokens", usage.prompt_tokens or 0)
+        span.set_attribute("llm.completion_tokens", usage.completion_tokens or 0)
+
+
+def _end_stream_span(
+    span: Any,
+    *,
+    started: float,
+    arrivals: List[float],
+    completion_chars: int,
+    error: Optional[BaseException],
+) -> None:
+    """
+    스트림 span 마무리: 첫 토큰까지 시간(TTFT), 청크 간 간격 p95, 청크/글자 수.
+    (async generator는 yield 사이에 다른 컨텍스트에서 재개되므로 current span으로 붙이지 않고 직접 end)
+    """
+    span.set_attribute("llm.chunks", len(arrivals))
+    span.set_attribute("llm.completion_chars", completion_chars)
+    if arrivals:
+        span.set_attribute("llm.ttft_ms", (arrivals[0] - started) * 1000)
+    gaps = sorted(b - a for a, b in zip(arrivals, arrivals[1:]))
+    if gaps:
+        span.set_attribute("llm.inter_chunk_p95_ms", gaps[min(len(gaps) - 1, int(len(gaps) * 0.95))] * 1000)
+    if isinstance(error, Exception):
+        span.record_exception(error)
+        span.set_status(Status(StatusCode.ERROR, str(error)))
+    elif error is not None:  # 클라이언트 연결 끊김(CancelledError) / 소비 측 중단(GeneratorExit)
+        span.set_attribute("llm.aborted", True)
+    span.end()
+
+
+async def _yield_chunks(chunks: Tuple[str, ...]) -> AsyncIterator[str]:
+    for chunk in chunks:
+        yield chunk
+        await asyncio.sleep(0)  # 실제 스트림처럼 청크 사이에 이벤트 루프에 양보
 
 
 class LLMService:
-    """LLM 제공자(Provider)와의 상호작용을 위한 서비스"""
-    
-    def __init__(self):
-        self.provider = llm_config.provider
-        self._client = None
-        self._initialized = False
-        self._initialize_client()
+    """
+    LLM 제공자(Provider)와의 상호작용을 위한 서비스.
+
+    AsyncOpenAI/AsyncAzureOpenAI를 await로 호출하므로, 응답을 기다리는 동안 이벤트 루프가
+    다른 요청을 처리합니다. (동시 요청 수는 스레드풀이 아니라 공유 HTTP 풀 크기가 상한)
+    """
     
-    def _initialize_client(self):
+    def __init__(self, semantic_cache: Optional[SemanticCache] = None):
+        # 설정 로드/클라이언트 생성은 처음 쓰일 때(_settings)로 미룹니다.
+        # (/health만 호출되거나 import만 하는 도구/스크립트는 비용을 치르지 않음)
+        self._init_lock = threading.Lock()
+        # 주입된 캐시가 있으면 설정(SEMANTIC_CACHE_ENABLED)으로 만든 캐시보다 우선
+        self._semantic_cache = semantic_cache
+        # temperature 0 전용: 정확 일치 LRU + 진행 중인 같은 요청(single-flight)
+        self._exact_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._inflight: Dict[str, "asyncio.Future[str]"] = {}
+
+    @cached_property
+    def _settings(self) -> _ClientSettings:
+        # cached_property가 결과를 인스턴스에 저장하므로 이후 호출은 분기 없이 속성 조회만 합니다.
+        # 동시에 처음 접근해도 클라이언트는 하나만 만들도록 락 안에서 한 번 더 확인합니다.
+        with self._init_lock:
+            cached = self.__dict__.get("_settings")
+            return cached if cached is not None else self._initialize_client()
+
+    @property
+    def provider(self) -> str:
+        return self._settings.provider
+
+    @staticmethod
+    def _initialize_client() -> _ClientSettings:
         """제공자(Provider) 설정에 따라 적절한 LLM 클라이언트를 초기화합니다."""
-        if self.provider == "mock":
-            self._client = None
-            self._initialized = True
-            return
+        llm_config = get_llm_config()
+        if llm_config.provider == "mock":
+            return _MOCK_SETTINGS
 
-        if self.provider == "azure_openai":
+        # 제공자별로 달라지는 것은 클라이언트와 model/temperature/max_tokens/임베딩 모델뿐입니다.
+        # 여기서 한 번 고르고, 그 뒤(create 바인딩/캐시 구성)는 두 제공자가 같은 코드를 씁니다.
+        if llm_config.provider == "azure_openai":
             if not (llm_config.azure_openai_api_key and llm_config.azure_openai_endpoint and llm_config.azure_openai_deployment_name):
-                self.provider = "mock"
-                self._client = None
-                self._initialized = True
-                return
-            self._client = AzureOpenAI(
+                return _MOCK_SETTINGS
+            client = AsyncAzureOpenAI(
                 api_key=llm_config.azure_openai_api_key,
                 api_version=llm_config.azure_openai_api_version,
                 azure_endpoint=llm_config.azure_openai_endpoint,
+                http_client=_shared_http_client(),
             )
-            self._deployment_name = llm_config.azure_openai_deployment_name
-            self._temperature = llm_config.azure_openai_temperature
-            self._max_tokens = llm_config.azure_openai_max_tokens
-            self._initialized = True
+            model = llm_config.azure_openai_deployment_name
+            temperature = llm_config.azure_openai_temperature
+            max_tokens = llm_config.azure_openai_max_tokens
+            embedding_model = llm_config.azure_embedding_deployment_name
         else:  # openai
             if not llm_config.openai_api_key:
-                self.provider = "mock"
-                self._client = None
-                self._initialized = True
-                return
-            self._client = OpenAI(
+                return _MOCK_SETTINGS
+            client = AsyncOpenAI(
                 api_key=llm_config.openai_api_key,
                 base_url=llm_config.openai_base_url,
+                http_client=_shared_http_client(),
             )
-            self._model = llm_config.openai_model
-            self._temperature = llm_config.openai_temperature
-            self._max_tokens = llm_config.openai_max_tokens
-            self._initialized = True
+            model = llm_config.openai_model
+            temperature = llm_config.openai_temperature
+            max_tokens = llm_config.openai_max_tokens
+            embedding_model = llm_config.embedding_model
+
+        create = partial(client.chat.completions.create, model=model, temperature=temperature, max_tokens=max_tokens)
+        cache = _semantic_cache_for(client, embedding_model) if llm_config.semantic_cache_enabled else None
+        return _ClientSettings(
+            provider=llm_config.provider,
+            client=client,
+            create=create,
+            semantic_cache=cache,
+            deterministic=temperature == 0,
+        )
+
+    @staticmethod
+    def _build_messages(
+        message: str,
+        conversation_history: Optional[List[ChatMessage]] = None,
+        system_prompt: Optional[str] = None,
+        context: Optional[str] = None,
+    ) -> List[dict]:
+        """
+        chat/stream_chat 공용 messages 목록:
+        [고정 system] + [최근 대화(원래 순서/내용 그대로)] + [이번 요청의 동적 context] + [사용자 메시지].
+
+        제공자 프롬프트 캐시는 앞부분 바이트가 같아야 재사용되므로, 바뀌지 않는 부분을 앞에 두고
+        요청마다 달라지는 관찰/검색 결과는 별도 메시지로 맨 뒤(사용자 메시지 바로 앞)에 둡니다.
+        """
+        messages = [{"role": "system", "content": system_prompt}] if system_prompt else []
+        if conversation_history:
+            # 최근 _HISTORY_WINDOW_MESSAGES개만 변환 (앞쪽 오래된 턴은 보지도 않음)
+            messages += [{"role": m.role, "content": m.content} for m in conversation_history[-_HISTORY_WINDOW_MESSAGES:]]
+        if context:
+            messages.append({"role": "system", "content": context})
+        messages.append({"role": "user", "content": message})
+        return messages
 
     def is_enabled(self) -> bool:
-        return self.provider in ("openai", "azure_openai") and self._client is not None
+        return self._settings.create is not None
+
+    async def _semantic_lookup(
+        self,
+        message: str,
+        conversation_history: Optional[List[ChatMessage]],
+        system_prompt: Optional[str],
+        context: Optional[str],
+    ) -> Tuple[Optional[str], Optional[Callable[[str], None]]]:
+        """
+        (캐시된 응답, 새 응답 저장 함수). 캐시가 꺼져 있거나 임베딩이 실패하면 (None, None).
+        """
+        cache = self._semantic_cache or self._settings.semantic_cache
+        if cache is None:
+            return None, None
+        vec = await cache.embed(message)
+        if vec is None:
+            return None, None
+        # 실제로 프롬프트에 실리는 최근 대화만 scope에 반영
+        history = conversation_history[-_HISTORY_WINDOW_MESSAGES:] if conversation_history else None
+        scope = cache.scope_key(system_prompt, history, context)
+        return cache.lookup(scope, vec), partial(cache.store, scope, vec)
     
-    def chat(
+    async def chat(
         self,
         message: str,
-        conversation_history: Optional[List[ChatMessage]] = None
+        conversation_history: Optional[List[ChatMessage]] = None,
+        system_prompt: Optional[str] = None,
+        context: Optional[str] = None,
     ) -> str:
         """
         LLM에 채팅 메시지를 전송하고 응답을 받습니다.
@@ -67,120 +313,210 @@ class LLMService:
         Args:
             message: 사용자의 메시지
             conversation_history: 대화의 이전 메시지 내역
+            system_prompt: 요청마다 바뀌지 않는 지시문. 맨 앞 system 메시지로 보내므로
+                제공자의 프롬프트 캐시(동일 prefix 재사용)에 걸립니다.
+            context: 요청마다 바뀌는 자료(툴 관찰 등). 사용자 메시지 바로 앞 별도 메시지로 보냅니다.
             
         Returns:
             어시스턴트(AI)의 응답 내용
         """
-        if not self._initialized:
-            self._initialize_client()
-        if self.provider == "mock":
-            return "현재 LLM이 설정되지 않아(mock) 마이크로서비스 오케스트레이터로 처리합니다."
+        settings = self._settings
+        create = settings.create
+        if create is None:  # mock
+            return _MOCK_REPLY
 
-        # Build messages list
-        messages = []
-        
-        # Add conversation history if provided
-        if conversation_history:
-            for msg in conversation_history:
-                messages.append({
-                    "role": msg.role,
-                    "content": msg.content
-                })
+        messages = self._build_messages(message, conversation_history, system_prompt, context)
+        if not settings.deterministic:
+            return await self._complete(create, messages, message, conversation_history, system_prompt, context)
+
+        key = _exact_key(create, messages)
+        hit = self._exact_cache.get(key)
+        if hit is not None:
+            self._exact_cache.move_to_end(key)
+            return hit
+        task = self._inflight.get(key)
+        if task is None:
+            # 업스트림 호출은 별도 task로 돌립니다. 먼저 보낸 요청이 취소(클라이언트 연결 끊김)돼도
+            # 같은 결과를 기다리는 다른 요청들을 위해 호출은 끝까지 진행됩니다.
+            task = asyncio.ensure_future(
+                self._complete(create, messages, message, conversation_history, system_prompt, context)
+            )
+            self._inflight[key] = task
+            task.add_done_callback(partial(self._finish_inflight, key))
+        # 같은 요청이 이미 진행 중이면 새로 보내지 않고 그 결과를 함께 기다립니다. (single-flight)
+        # shield: 기다리던 요청 하나가 취소돼도 공유 task는 취소되지 않음
+        return await asyncio.shield(task)
+
+    def _finish_inflight(self, key: str, task: "asyncio.Future[str]") -> None:
+        """single-flight task 완료 처리: 진행 중 목록에서 빼고, 성공한 응답만 정확 일치 캐시에 저장."""
+        self._inflight.pop(key, None)
+        # exception() 호출로 "never retrieved" 경고도 막습니다. (오류는 기다리던 요청들이 각자 받음)
+        if task.cancelled() or task.exception() is not None:
+            return
+        content = task.result()
+        if content:
+            self._exact_cache[key] = content
+            if len(self._exact_cache) > _EXACT_CACHE_SIZE:
+                self._exact_cache.popitem(last=False)
+
+    async def _complete(
+        self,
+        create: Callable[..., Any],
+        messages: List[dict],
+        message: str,
+        conversation_history: Optional[List[ChatMessage]],
+        system_prompt: Optional[str],
+        context: Optional[str],
+    ) -> str:
+        """실제 제공자 호출 (의미 캐시가 켜져 있으면 먼저 조회하고, 새 응답을 저장)."""
+        cached, remember = await self._semantic_lookup(message, conversation_history, system_prompt, context)
+        if cached is not None:
+            return cached
+
+        with _chat_span(self._settings.provider, create) as span:
+            response = await create(messages=messages)
+            if span is not None:
+                _record_usage(span, response)
         
-        # Add current user message
-        messages.append({
-            "role": "user",
-            "content": message
-        })
+        content = response.choices[0].message.content
+        if remember is not None and content:
+            remember(content)
+        return content
+    
+    async def chat_many(
+        self,
+        prompts: Sequence[str],
+        system_prompt: Optional[str] = None,
+        concurrency: int = 20,
+    ) -> List[Union[str, BaseException]]:
+        """
+        여러 프롬프트를 동시에 보내고 입력 순서대로 응답을 돌려줍니다. (일괄 채점/요약 등)
         
-        # Call the appropriate API
-        if self.provider == "azure_openai":
-            response = self._client.chat.completions.create(
-                model=self._deployment_name,
-                messages=messages,
-                temperature=self._temperature,
-                max_tokens=self._max_tokens,
-            )
-        else:  # openai
-            response = self._client.chat.completions.create(
-                model=self._model,
-                messages=messages,
-                temperature=self._temperature,
-                max_tokens=self._max_tokens,
-            )
+        LLM 호출은 I/O 대기라 겹쳐 보내면 처리량이 동시 요청 수만큼 늘어납니다.
+        concurrency로 동시 요청 수를 제한해 제공자 요청 한도(QPM)를 넘지 않도록 합니다.
         
-        return response.choices[0].message.content
+        Returns:
+            프롬프트별 응답. 실패한 항목은 예외 객체가 그 자리에 들어갑니다. (나머지 결과는 유지)
+        """
+        sem = asyncio.Semaphore(max(1, concurrency))
+
+        async def one(prompt: str) -> str:
+            async with sem:
+                return await self.chat(prompt, system_prompt=system_prompt)
+
+        return await asyncio.gather(*(one(p) for p in prompts), return_exceptions=True)
     
-    def stream_chat(
+    async def stream_chat(
         self,
         message: str,
-        conversation_history: Optional[List[ChatMessage]] = None
-    ):
+        conversation_history: Optional[List[ChatMessage]] = None,
+        system_prompt: Optional[str] = None,
+        context: Optional[str] = None,
+        *,
+        min_batch_chars: int = 1,
+        max_batch_chars: int = _STREAM_BATCH_MAX_CHARS,
+        growth_factor: int = 3,
+    ) -> AsyncIterator[str]:
         """
         LLM으로부터 채팅 응답을 스트리밍 방식으로 받습니다.
         
         Args:
             message: 사용자의 메시지
             conversation_history: 대화의 이전 메시지 내역
+            system_prompt: 고정 지시문 (chat과 동일하게 맨 앞 system 메시지)
+            context: 요청마다 바뀌는 자료 (사용자 메시지 바로 앞)
+            min_batch_chars/max_batch_chars/growth_factor: 토큰 묶음 크기. 첫 묶음은 min으로 시작해
+                growth_factor배씩 늘고 max에서 멈춤. (타자 치는 듯한 효과를 원하면 max를 작게)
             
         Yields:
             어시스턴트(AI) 응답의 청크(조각) 데이터
         """
-        if not self._initialized:
-            self._initialize_client()
-        if self.provider == "mock":
-            text = self.chat(message=message, conversation_history=conversation_history)
-            for i in range(0, len(text), 32):
-                yield text[i : i + 32]
+        create = self._settings.create
+        if create is None:  # mock
+            async for piece in _yield_chunks(_MOCK_CHUNKS):
+                yield piece
             return
 
-        # Build messages list
-        messages = []
-        
-        # Add conversation history if provided
-        if conversation_history:
-            for msg in conversation_history:
-                messages.append({
-                    "role": msg.role,
-                    "content": msg.content
-                })
+        cached, remember = await self._semantic_lookup(message, conversation_history, system_prompt, context)
+        if cached is not None:
+            async for piece in _yield_chunks(_slices(cached)):
+                yield piece
+            return
+
+        messages = self._build_messages(message, conversation_history, system_prompt, context)
         
-        # Add current user message
-        messages.append({
-            "role": "user",
-            "content": message
-        })
+        span = _tracer.start_span("llm.stream_chat", attributes=_span_attributes(self._settings.provider, create)) if _tracer else None
+        started = time.monotonic()
+        arrivals: List[float] = []  # span이 있을 때만 채움 (청크 도착 시각)
+        error: Optional[BaseException] = None
+        try:
+            stream = await create(messages=messages, stream=True)
+        except Exception as e:
+            if span is not None:
+                _end_stream_span(span, started=started, arrivals=arrivals, completion_chars=0, error=e)
+            raise
+        parts: List[str] = []
+        # 토큰 조각을 모아서 내보냅니다. 첫 조각은 바로(TTFB 유지), 이후 묶음 크기를 growth_factor배씩
+        # 늘려 max_batch_chars에서 멈춥니다. 줄바꿈이 오거나 마지막 flush 후 _STREAM_FLUSH_INTERVAL이
+        # 지났으면 크기가 덜 찼어도 내보냅니다. (느린 스트림에서 글자가 묶여 멈춘 듯 보이지 않도록)
+        pending: List[str] = []
+        pending_len = 0
+        batch_chars = max(1, min_batch_chars)
+        last_flush = time.monotonic()
         
-        # Call the appropriate API with streaming
-        if self.provider == "azure_openai":
-            stream = self._client.chat.completions.create(
-                model=self._deployment_name,
-                messages=messages,
-                temperature=self._temperature,
-                max_tokens=self._max_tokens,
-                stream=True,
-            )
-        else:  # openai
-            stream = self._client.chat.completions.create(
-                model=self._model,
-                messages=messages,
-                temperature=self._temperature,
-                max_tokens=self._max_tokens,
-                stream=True,
-            )
-        
-        for chunk in stream:
-            try:
-                choices = getattr(chunk, "choices", None)
-                if not choices or len(choices) == 0:
+        try:
+            async for chunk in stream:
+                choices = chunk.choices
+                if not choices:  # Azure 콘텐츠 필터 결과 등 choices가 빈 청크
+                    continue
+                delta = choices[0].delta
+                content = delta.content if delta is not None else None
+                if not content:
                     continue
-                delta = getattr(choices[0], "delta", None)
-                content = getattr(delta, "content", None) if delta is not None else None
-                if content:
-                    yield content
-            except Exception:
-                # Never crash streaming due to provider-specific chunk shapes
-                continue
+                pending.append(content)
+                pending_len += len(content)
+                now = time.monotonic()
+                if span is not None:
+                    arrivals.append(now)
+                if pending_len >= batch_chars or "\n" in content or now - last_flush >= _STREAM_FLUSH_INTERVAL:
+                    text = "".join(pending)
+                    pending.clear()
+                    pending_len = 0
+                    batch_chars = min(batch_chars * growth_factor, max_batch_chars)
+                    last_flush = now
+                    parts.append(text)
+                    yield text
+
+            if pending:
+                text = "".join(pending)
+                parts.append(text)
+                yield text
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            # 다 읽었든, 클라이언트 연결이 끊겨 취소(CancelledError)됐든, 소비 측이 중간에 닫았든(GeneratorExit)
+            # 업스트림 응답을 닫아 더 이상 토큰을 받지(과금되지) 않게 합니다.
+            await _aclose_stream(stream)
+            if span is not None:
+                _end_stream_span(
+                    span,
+                    started=started,
+                    arrivals=arrivals,
+                    completion_chars=sum(map(len, parts)),
+                    error=error,
+                )
+
+        # 끝까지 받은 응답만 저장 (중간에 끊긴 스트림은 위에서 빠져나가므로 여기까지 오지 않음)
+        if remember is not None and parts:
+            remember("".join(parts))
+
+    async def aclose(self) -> None:
+        """종료 시 공유 HTTP 풀을 닫습니다. (클라이언트를 만든 적이 없으면 아무것도 하지 않음)"""
+        if _shared_http_client.cache_info().currsize:
+            await _shared_http_client().aclose()
+            _shared_http_client.cache_clear()
+            self.__dict__.pop("_settings", None)
 
 
 # Global service instance
@@ -0,0 +1,117 @@
+"""
+임베딩 유사도 기반 LLM 응답 캐시 (semantic cache).
+
+역할:
+- 사용자 메시지를 임베딩해 최근 응답들과 코사인 유사도를 비교
+- 유사도가 임계값(기본 0.9) 이상이면 저장된 응답을 그대로 반환 (LLM 호출 생략)
+- 같은 system 지시문 + 대화 내역 + 동적 context(scope)끼리만 비교하므로 문맥이 다른 질문은 섞이지 않음
+
+주의:
+- 에이전트 흐름의 프롬프트에는 실시간 툴 관찰값(날씨/일정 등)이 들어가므로,
+  숫자 몇 개만 다른 프롬프트도 유사도가 매우 높게 나옵니다. 그래서 기본은 꺼져 있고
+  (SEMANTIC_CACHE_ENABLED), FAQ처럼 답이 바뀌지 않는 배포에서만 켜는 것을 권장합니다.
+- 프로세스 내부(in-memory) 캐시입니다. (max_entries 개수 상한 LRU + TTL)
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from operator import mul
+from typing import Any, Awaitable, Callable, Iterable, Optional, Sequence
+
+try:  # optional: numpy - 있으면 벡터 내적을 C로 계산
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+EmbedFn = Callable[[str], Awaitable[Sequence[float]]]
+
+
+def _normalize(vec: Sequence[float]) -> Any:
+    """단위 벡터로 정규화 (이후 코사인 유사도 = 내적)."""
+    if np is not None:
+        arr = np.asarray(vec, dtype=np.float32)
+        norm = float(np.linalg.norm(arr))
+        return arr / norm if norm else arr
+    norm = math.sqrt(sum(map(mul, vec, vec)))
+    return [v / norm for v in vec] if norm else list(vec)
+
+
+def _dot(a: Any, b: Any) -> float:
+    if np is not None:
+        return float(a @ b)
+    return sum(map(mul, a, b))
+
+
+@dataclass
+class _Entry:
+    scope: int
+    vec: Any
+    response: str
+    expires_at: float
+
+
+class SemanticCache:
+    """
+    임베딩 유사도로 조회하는 (프로세스 내부) 응답 캐시.
+
+    embed_fn: 텍스트 -> 임베딩 벡터를 돌려주는 async 함수 (예: embeddings.create 래퍼)
+    """
+
+    def __init__(
+        self,
+        embed_fn: EmbedFn,
+        *,
+        threshold: float = 0.9,
+        ttl_seconds: float = 300.0,
+        max_entries: int = 256,
+    ):
+        self._embed_fn = embed_fn
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._next_id = 0
+
+    @staticmethod
+    def scope_key(system_prompt: Optional[str], history: Optional[Iterable[Any]], context: Optional[str] = None) -> int:
+        """system 지시문 + 대화 내역 + 동적 context 해시. 같은 scope 안에서만 유사도를 비교합니다."""
+        return hash((system_prompt or "", tuple((m.role, m.content) for m in history or ()), context or ""))
+
+    async def embed(self, text: str) -> Optional[Any]:
+        """정규화된 임베딩. 임베딩 호출이 실패하면 None (캐시를 건너뛰고 LLM을 그대로 호출)."""
+        try:
+            return _normalize(await self._embed_fn(text))
+        except Exception:
+            return None
+
+    def lookup(self, scope: int, vec: Any) -> Optional[str]:
+        """같은 scope의 유효한 항목 중 가장 유사한 응답 (임계값 미만이면 None)."""
+        now = time.monotonic()
+        best_id, best_score = None, self.threshold
+        for entry_id, entry in list(self._entries.items()):
+            if entry.expires_at <= now:
+                del self._entries[entry_id]
+                continue
+            if entry.scope != scope:
+                continue
+            score = _dot(vec, entry.vec)
+            if score >= best_score:
+                best_id, best_score = entry_id, score
+        if best_id is None:
+            return None
+        self._entries.move_to_end(best_id)
+        return self._entries[best_id].response
+
+    def store(self, scope: int, vec: Any, response: str) -> None:
+        self._entries[self._next_id] = _Entry(scope, vec, response, time.monotonic() + self.ttl_seconds)
+        self._next_id += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
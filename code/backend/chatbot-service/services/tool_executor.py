@@ -11,12 +11,46 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set, Tuple
+import asyncio
+import ssl
+import time
 
 import httpx
 
 from agents.context_manager import context_manager
 
+try:  # optional: h2 (httpx[http2]) - 없으면 HTTP/1.1 커넥션 풀만 사용
+    import h2
+except ImportError:  # pragma: no cover
+    h2 = None
+
+try:  # optional: orjson (Rust 기반 JSON 디코더) - 없으면 httpx 기본 json 파서 사용
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+@lru_cache(maxsize=2)
+def _ssl_context(http2: bool) -> ssl.SSLContext:
+    """
+    프로세스 전체가 공유하는 TLS 컨텍스트.
+    - CA 번들 로딩을 클라이언트마다 반복하지 않음
+    - 세션 티켓(OP_NO_TICKET 해제)을 허용해 서버가 재개(resumption)를 지원하면 재연결 핸드셰이크가 짧아짐
+    """
+    ctx = httpx.create_ssl_context(http2=http2)
+    ctx.options &= ~ssl.OP_NO_TICKET
+    return ctx
+
+
+def decode_json(r: httpx.Response) -> Any:
+    """응답 본문(JSON)을 디코딩합니다. 상태 코드가 오류면 예외를 던집니다."""
+    r.raise_for_status()
+    if orjson is not None:
+        return orjson.loads(r.content)
+    return r.json()
+
 
 DEFAULT_TOOL_SPECS: List[Dict[str, Any]] = [
     # Weather Tools  
@@ -81,6 +115,73 @@ class ToolExecutor:
     notification_base_url: str
     rag_base_url: str
     tools: List[ToolDef]
+    timeout: float = 10.0
+    max_concurrency: int = 8
+    weather_ttl: float = 60.0  # 프로세스 단위 날씨 캐시 TTL(초)
+    search_batch_window: float = 0.005  # file.search 묶음 대기 시간(초). 0이면 묶지 않음
+
+    def __post_init__(self) -> None:
+        # 호출마다 AsyncClient를 새로 만들면 TCP/TLS 핸드셰이크를 매번 다시 합니다.
+        # 실행기 수명 동안 하나의 클라이언트(커넥션 풀, keep-alive)를 재사용합니다.
+        # h2 패키지가 있으면 HTTP/2로 협상해 동시 요청들이 한 커넥션을 스트림으로 나눠 씁니다.
+        # (평문 http:// 서비스나 HTTP/1.1 서버라면 httpx가 자동으로 HTTP/1.1을 사용)
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            http2=h2 is not None,
+            verify=_ssl_context(h2 is not None),
+        )
+        # 동시에 실행할 툴 호출 수 상한 (다운스트림 서비스 과부하 방지)
+        self._sem = asyncio.Semaphore(self.max_concurrency)
+        # 진행 중인 읽기 전용 호출 (cache_key -> Task). 같은 호출이 동시에 들어오면 하나만 보냅니다.
+        self._inflight: Dict[str, "asyncio.Task[Any]"] = {}
+        # 도시별 현재 날씨 캐시 (정규화된 도시명 -> (저장 시각, 결과)). 세션과 무관하게 공유.
+        self._weather_cache: Dict[str, Tuple[float, Any]] = {}
+        # 짧은 시간 창 안에 들어온 file.search 요청들을 모아 한 번에 보냅니다. (query, future)
+        self._search_pending: List[Tuple[str, "asyncio.Future[Any]"]] = []
+        self._search_flush: Optional["asyncio.Task[None]"] = None
+
+        # 엔드포인트 URL은 호출마다 조립하지 않고 여기서 한 번만 만들어 둡니다.
+        # (환경변수에 끝 슬래시가 붙어 있어도 "//"가 생기지 않도록 정규화)
+        # 고정 경로는 httpx.URL로 미리 파싱해 두면 요청마다 문자열 URL을 다시 파싱하지 않습니다.
+        # 경로 파라미터가 붙는 엔드포인트는 접두사 문자열로 두고 호출 시 이어 붙입니다.
+        weather = self.weather_base_url.rstrip("/")
+        calendar = self.calendar_base_url.rstrip("/")
+        files = self.file_base_url.rstrip("/")
+        notification = self.notification_base_url.rstrip("/")
+        rag = self.rag_base_url.rstrip("/")
+        self._url_weather = f"{weather}/weather/"  # + {city}[/forecast]
+        self._url_calendar_today = httpx.URL(f"{calendar}/calendar/today")
+        self._url_calendar_tomorrow = httpx.URL(f"{calendar}/calendar/tomorrow")
+        self._url_calendar_date = f"{calendar}/calendar/date/"  # + {date}
+        self._url_calendar_events = httpx.URL(f"{calendar}/calendar/events")
+        self._url_calendar_free_time = f"{calendar}/calendar/free-time/"  # + {date}
+        self._url_calendar_summary = httpx.URL(f"{calendar}/calendar/summary")
+        self._url_files = httpx.URL(f"{files}/files")
+        self._url_files_search = httpx.URL(f"{files}/files/search")
+        self._url_files_search_batch = httpx.URL(f"{files}/files/search/batch")
+        self._url_file = f"{files}/files/"  # + {file_id}
+        self._url_files_content = f"{files}/files/content/"  # + {file_id}
+        self._url_directories = httpx.URL(f"{files}/directories")
+        self._url_notifications = f"{notification}/notifications/"  # + {notification_id}
+        self._url_notifications_send = httpx.URL(f"{notification}/notifications/send")
+        self._url_notifications_history = httpx.URL(f"{notification}/notifications/history")
+        self._url_notifications_stats = httpx.URL(f"{notification}/notifications/stats")
+        self._url_rag_query = httpx.URL(f"{rag}/rag/query")
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """실행기가 소유한 공유 AsyncClient (닫기는 aclose()가 담당)"""
+        return self._client
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def __aenter__(self) -> "ToolExecutor":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
 
     def tool_schema(self, tool_name: str) -> Dict[str, Any]:
         for t in self.tools:
@@ -94,19 +195,26 @@ class ToolExecutor:
                 return t.ttl_seconds
         return None
 
-    async def call_tool(self, client: httpx.AsyncClient, tool: str, args: Dict[str, Any]) -> Any:
+    async def call_tool(self, tool: str, args: Dict[str, Any]) -> Any:
+        client = self._client
         # Weather Tools
         if tool == "weather.get":
             city = (args.get("city") or "서울").strip()
-            r = await client.get(f"{self.weather_base_url}/weather/{city}")
-            r.raise_for_status()
-            return r.json()
+            key = city.lower()
+            hit = self._weather_cache.get(key)
+            if hit is not None and time.monotonic() - hit[0] < self.weather_ttl:
+                return hit[1]
+            r = await client.get(self._url_weather + city)
+            data = decode_json(r)
+            if len(self._weather_cache) >= 512:  # 가장 오래 전에 넣은 항목부터 버림
+                self._weather_cache.pop(next(iter(self._weather_cache)))
+            self._weather_cache[key] = (time.monotonic(), data)
+            return data
         
         if tool == "weather.forecast":
             city = (args.get("city") or "서울").strip()
-            r = await client.get(f"{self.weather_base_url}/weather/{city}/forecast")
-            r.raise_for_status()
-            return r.json()
+            r = await client.get(self._url_weather + city + "/forecast")
+            return decode_json(r)
             
         if tool == "weather.cities":
             # Use hardcoded city list since /cities endpoint has issues
@@ -119,63 +227,55 @@ class ToolExecutor:
         # Calendar Tools
         if tool == "calendar.get":
             when = (args.get("when") or "today").strip().lower()
-            endpoint = "/calendar/tomorrow" if when in ("tomorrow", "내일") else "/calendar/today"
-            r = await client.get(f"{self.calendar_base_url}{endpoint}")
-            r.raise_for_status()
-            return r.json()
+            url = self._url_calendar_tomorrow if when in ("tomorrow", "내일") else self._url_calendar_today
+            r = await client.get(url)
+            return decode_json(r)
             
         if tool == "calendar.get_date":
             date = (args.get("date") or "").strip()
-            r = await client.get(f"{self.calendar_base_url}/calendar/date/{date}")
-            r.raise_for_status()
-            return r.json()
+            r = await client.get(self._url_calendar_date + date)
+            return decode_json(r)
 
         if tool == "calendar.create":
             title = (args.get("title") or "새 일정").strip()
             start_time = (args.get("start_time") or "09:00").strip()
-            r = await client.post(f"{self.calendar_base_url}/calendar/events", json={"title": title, "start_time": start_time})
-            r.raise_for_status()
-            return r.json()
+            r = await client.post(self._url_calendar_events, json={"title": title, "start_time": start_time})
+            return decode_json(r)
             
         if tool == "calendar.free_time":
             date = (args.get("date") or "").strip()
-            r = await client.get(f"{self.calendar_base_url}/calendar/free-time/{date}")
-            r.raise_for_status()
-            return r.json()
+            r = await client.get(self._url_calendar_free_time + date)
+            return decode_json(r)
             
         if tool == "calendar.summary":
-            r = await client.get(f"{self.calendar_base_url}/calendar/summary")
-            r.raise_for_status()
-            return r.json()
+            r = await client.get(self._url_calendar_summary)
+            return decode_json(r)
 
         # File Tools
         if tool == "file.search":
             q = (args.get("q") or "").strip()
-            r = await client.get(f"{self.file_base_url}/files/search", params={"q": q})
-            r.raise_for_status()
-            return r.json()
+            if self.search_batch_window > 0:
+                return await self._search_batched(q)
+            r = await client.get(self._url_files_search, params={"q": q})
+            return decode_json(r)
             
         if tool == "file.get":
             file_id = (args.get("file_id") or "").strip()
-            r = await client.get(f"{self.file_base_url}/files/{file_id}")
-            r.raise_for_status()
-            return r.json()
+            r = await client.get(self._url_file + file_id)
+            return decode_json(r)
             
         if tool == "file.content":
             file_id = (args.get("file_id") or "").strip()
-            r = await client.get(f"{self.file_base_url}/files/content/{file_id}")
-            r.raise_for_status()
-            return r.json()
+            r = await client.get(self._url_files_content + file_id)
+            return decode_json(r)
             
         if tool == "file.list":
-            r = await client.get(f"{self.file_base_url}/files")
-            r.raise_for_status()
-            return r.json()
+            r = await client.get(self._url_files)
+            return decode_json(r)
             
         if tool == "file.directories":
-            r = await client.get(f"{self.file_base_url}/directories")
-            r.raise_for_status()
-            return r.json()
+            r = await client.get(self._url_directories)
+            return decode_json(r)
             
         if tool == "file.create":
             payload = {
@@ -183,9 +283,8 @@ class ToolExecutor:
                 "content": (args.get("content") or "").strip(),
                 "path": (args.get("path") or "/").strip(),
             }
-            r = await client.post(f"{self.file_base_url}/files", json=payload)
-            r.raise_for_status()
-            return r.json()
+            r = await client.post(self._url_files, json=payload)
+            return decode_json(r)
 
         # Notification Tools
         if tool == "notification.send":
@@ -195,44 +294,140 @@ class ToolExecutor:
                 "recipient": (args.get("recipient") or "team").strip(),
                 "channel": (args.get("channel") or "slack").strip(),
             }
-            r = await client.post(f"{self.notification_base_url}/notifications/send", json=payload)
-            r.raise_for_status()
-            return r.json()
+            r = await client.post(self._url_notifications_send, json=payload)
+            return decode_json(r)
             
         if tool == "notification.history":
-            r = await client.get(f"{self.notification_base_url}/notifications/history")
-            r.raise_for_status()
-            return r.json()
+            r = await client.get(self._url_notifications_history)
+            return decode_json(r)
             
         if tool == "notification.stats":
-            r = await client.get(f"{self.notification_base_url}/notifications/stats")
-            r.raise_for_status()
-            return r.json()
+            r = await client.get(self._url_notifications_stats)
+            return decode_json(r)
             
         if tool == "notification.get":
             notification_id = (args.get("notification_id") or "").strip()
-            r = await client.get(f"{self.notification_base_url}/notifications/{notification_id}")
-            r.raise_for_status()
-            return r.json()
+            r = await client.get(self._url_notifications + notification_id)
+            return decode_json(r)
 
         # RAG Tools
         if tool == "rag.query":
             query = (args.get("query") or "").strip()
             top_k = int(args.get("top_k") or 5)
-            r = await client.post(f"{self.rag_base_url}/rag/query", json={"query": query, "top_k": top_k})
-            r.raise_for_status()
-            return r.json()
+            r = await client.post(self._url_rag_query, json={"query": query, "top_k": top_k})
+            return decode_json(r)
 
         raise ValueError(f"Unknown tool: {tool}")
 
+    async def _search_batched(self, q: str) -> Any:
+        """file.search 요청을 search_batch_window 동안 모았다가 배치 엔드포인트로 한 번에 보냅니다."""
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._search_pending.append((q, fut))
+        if len(self._search_pending) == 1:
+            loop.call_later(self.search_batch_window, self._start_search_flush)
+        return await fut
+
+    def _start_search_flush(self) -> None:
+        self._search_flush = asyncio.ensure_future(self._flush_search())
+
+    async def _flush_search(self) -> None:
+        pending, self._search_pending = self._search_pending, []
+        try:
+            if len(pending) == 1:
+                r = await self._client.get(self._url_files_search, params={"q": pending[0][0]})
+                results = [decode_json(r)]
+            else:
+                queries = list(dict.fromkeys(q for q, _ in pending))
+                r = await self._client.post(self._url_files_search_batch, json={"queries": queries})
+                if r.status_code in (404, 405):  # 배치 엔드포인트가 없는 서비스면 개별 호출
+                    rs = await asyncio.gather(*[self._client.get(self._url_files_search, params={"q": q}) for q in queries])
+                    by_query = dict(zip(queries, [decode_json(x) for x in rs]))
+                else:
+                    by_query = dict(zip(queries, decode_json(r)["results"]))
+                results = [by_query[q] for q, _ in pending]
+        except Exception as e:
+            for _, fut in pending:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (_, fut), result in zip(pending, results):
+            if not fut.done():
+                fut.set_result(result)
+
+    async def _run_tool(self, session_id: str, task: Dict[str, Any], tool: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        """툴 1건을 (세션 캐시 확인 후) 실행하고 observation을 반환합니다. 예외는 observation의 error로 기록합니다."""
+        cache_key = context_manager.make_cache_key(tool, args)
+        ttl = self.tool_ttl(tool)
+        cached = context_manager.get_cached_tool_result(session_id, cache_key, ttl_seconds=ttl)
+        if cached is not None:
+            return {"task_id": task.get("id"), "tool": tool, "args": args, "cached": True, "result": cached}
+        try:
+            if ttl is None:  # 생성/발송 같은 부작용 있는 툴은 합치지 않음
+                async with self._sem:
+                    result = await self.call_tool(tool, args)
+            else:
+                result = await self._call_coalesced(cache_key, tool, args)
+            context_manager.set_cached_tool_result(session_id, cache_key, result)
+            return {"task_id": task.get("id"), "tool": tool, "args": args, "cached": False, "result": result}
+        except Exception as e:
+            return {"task_id": task.get("id"), "tool": tool, "args": args, "cached": False, "error": str(e)}
+
+    async def _call_coalesced(self, key: str, tool: str, args: Dict[str, Any]) -> Any:
+        """
+        single-flight: 같은 key의 호출이 이미 진행 중이면 새 HTTP 요청 없이 그 결과를 함께 기다립니다.
+        (세션이 달라도 동일한 읽기 전용 호출이면 공유)
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._guarded_call(tool, args))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._inflight.pop(key, None) if self._inflight.get(key) is t else None)
+        # 한 호출자가 취소돼도 다른 대기자를 위해 공유 태스크는 계속 진행
+        return await asyncio.shield(task)
+
+    async def _guarded_call(self, tool: str, args: Dict[str, Any]) -> Any:
+        async with self._sem:
+            return await self.call_tool(tool, args)
+
+    async def run_parallel(self, session_id: str, calls: List[Tuple[Dict[str, Any], str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        (task, tool, args) 묶음을 동시에 실행합니다. 결과 순서는 입력 순서와 같습니다.
+        전체 소요 시간은 호출 시간의 합이 아니라 가장 느린 호출 시간에 가까워집니다.
+        """
+        if len(calls) == 1:
+            task, tool, args = calls[0]
+            return [await self._run_tool(session_id, task, tool, args)]
+        return list(await asyncio.gather(*[self._run_tool(session_id, task, tool, args) for task, tool, args in calls]))
+
+    @staticmethod
+    def _independent_followers(
+        tasks: List[Dict[str, Any]], start: int, batch_ids: Set[Any]
+    ) -> List[Tuple[Dict[str, Any], str, Dict[str, Any]]]:
+        """
+        start부터 이어지는 태스크 중 함께 실행해도 되는 툴 호출을 고릅니다.
+        - args가 이미 채워져 있어야 함 (args 보완은 이전 observation을 참고하므로 순차 실행)
+        - 같은 묶음의 태스크에 의존(depends_on)하지 않아야 함
+        """
+        out: List[Tuple[Dict[str, Any], str, Dict[str, Any]]] = []
+        for t in tasks[start:]:
+            tool = str(t.get("tool") or "none").strip()
+            args = t.get("args") if isinstance(t.get("args"), dict) else {}
+            deps = t.get("depends_on") if isinstance(t.get("depends_on"), list) else []
+            if not tool or tool == "none" or not args or any(d in batch_ids for d in deps):
+                break
+            out.append((t, tool, args))
+            batch_ids.add(t.get("id"))
+        return out
+
     async def execute_plan(
         self,
         *,
         user_input: str,
         session_id: str,
         tasks: List[Dict[str, Any]],
-        fill_args_fn,  # callable(tool:str, schema:dict, observations:list[dict])->dict(args)
-        replan_fn=None,  # callable(tasks, observations)->new_tasks
+        fill_args_fn,  # async callable(tool:str, schema:dict, observations:list[dict])->dict(args)
+        replan_fn=None,  # async callable(tasks, observations)->new_tasks
         max_replans: int = 2,
     ) -> Tuple[List[Dict[str, Any]], List[str], List[Dict[str, Any]]]:
         """
@@ -243,43 +438,35 @@ class ToolExecutor:
         current_tasks = list(tasks)
 
         replans = 0
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            i = 0
-            while i < len(current_tasks):
-                t = current_tasks[i]
-                tool = str(t.get("tool") or "none").strip()
-                args = t.get("args") if isinstance(t.get("args"), dict) else {}
-
-                if tool and tool != "none":
-                    if not args:
-                        args = fill_args_fn(tool, self.tool_schema(tool), list(observations)) or {}
-
-                    cache_key = context_manager.make_cache_key(tool, args)
-                    ttl = self.tool_ttl(tool)
-                    cached = context_manager.get_cached_tool_result(session_id, cache_key, ttl_seconds=ttl)
-                    if cached is not None:
-                        observations.append({"task_id": t.get("id"), "tool": tool, "args": args, "cached": True, "result": cached})
-                    else:
-                        try:
-                            result = await self.call_tool(client, tool, args)
-                            context_manager.set_cached_tool_result(session_id, cache_key, result)
-                            observations.append({"task_id": t.get("id"), "tool": tool, "args": args, "cached": False, "result": result})
-                        except Exception as e:
-                            observations.append({"task_id": t.get("id"), "tool": tool, "args": args, "cached": False, "error": str(e)})
-
-                            if replan_fn and replans < max_replans:
-                                new_tasks = replan_fn(current_tasks, observations)
-                                if isinstance(new_tasks, list) and new_tasks:
-                                    current_tasks = list(new_tasks)
-                                    replans += 1
-                                    i = 0
-                                    continue
-
-                    used_tools.append(tool)
-                else:
-                    observations.append({"task_id": t.get("id"), "note": str(t.get("text") or "")})
-
-                i += 1
+        i = 0
+        while i < len(current_tasks):
+            t = current_tasks[i]
+            tool = str(t.get("tool") or "none").strip()
+            args = t.get("args") if isinstance(t.get("args"), dict) else {}
+
+            if tool and tool != "none":
+                if not args:
+                    args = await fill_args_fn(tool, self.tool_schema(tool), list(observations)) or {}
+
+                # 뒤이은 독립 태스크들은 함께 묶어 동시에 실행합니다.
+                calls = [(t, tool, args), *self._independent_followers(current_tasks, i + 1, {t.get("id")})]
+                results = await self.run_parallel(session_id, calls)
+                observations.extend(results)
+
+                if replan_fn and replans < max_replans and any("error" in ob for ob in results):
+                    new_tasks = await replan_fn(current_tasks, observations)
+                    if isinstance(new_tasks, list) and new_tasks:
+                        current_tasks = list(new_tasks)
+                        replans += 1
+                        i = 0
+                        continue
+
+                used_tools.extend(c[1] for c in calls)
+                i += len(calls)
+                continue
+
+            observations.append({"task_id": t.get("id"), "note": str(t.get("text") or "")})
+            i += 1
 
         return observations, sorted(list(set(used_tools))), current_tasks
 
@@ -0,0 +1,88 @@
+"""
+LLMService 정확 일치 캐시(single-flight) 테스트.
+
+실행:
+  cd code/backend/chatbot-service && python -m unittest discover -s tests
+"""
+
+import asyncio
+import sys
+import unittest
+from functools import partial
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(SERVICE_DIR), str(SERVICE_DIR.parent)]
+
+from services.llm_service import LLMService, _ClientSettings  # noqa: E402
+
+
+class _Obj:
+    def __init__(self, **kw):
+        self.__dict__.update(kw)
+
+
+def _service(calls: list, delay: float = 0.2) -> LLMService:
+    """temperature 0(deterministic) 설정의 LLMService. 제공자 호출은 delay 후 대문자 응답."""
+
+    async def create(*, messages, **_):
+        calls.append(messages[-1]["content"])
+        await asyncio.sleep(delay)
+        return _Obj(choices=[_Obj(message=_Obj(content=messages[-1]["content"].upper()))])
+
+    svc = LLMService()
+    svc.__dict__["_settings"] = _ClientSettings(
+        provider="openai",
+        create=partial(create, model="m", temperature=0, max_tokens=10),
+        deterministic=True,
+    )
+    return svc
+
+
+class SingleFlightTest(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_identical_requests_share_one_call(self):
+        calls: list = []
+        svc = _service(calls)
+        results = await asyncio.gather(*(svc.chat("hi") for _ in range(5)))
+        self.assertEqual(results, ["HI"] * 5)
+        self.assertEqual(calls, ["hi"])
+        # 완료 후에는 캐시에서 바로 응답
+        self.assertEqual(await svc.chat("hi"), "HI")
+        self.assertEqual(calls, ["hi"])
+
+    async def test_cancelled_leader_does_not_cancel_waiters(self):
+        calls: list = []
+        svc = _service(calls)
+        leader = asyncio.create_task(svc.chat("hi"))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(svc.chat("hi"))
+        await asyncio.sleep(0.01)
+
+        leader.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await leader
+
+        self.assertEqual(await follower, "HI")
+        self.assertEqual(calls, ["hi"])
+        self.assertEqual(svc._inflight, {})
+
+    async def test_error_reaches_waiters_and_is_not_cached(self):
+        attempts: list = []
+
+        async def create(*, messages, **_):
+            attempts.append(1)
+            await asyncio.sleep(0.05)
+            raise RuntimeError("provider down")
+
+        svc = LLMService()
+        svc.__dict__["_settings"] = _ClientSettings(provider="openai", create=create, deterministic=True)
+        results = await asyncio.gather(svc.chat("hi"), svc.chat("hi"), return_exceptions=True)
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertEqual(len(attempts), 1)
+        with self.assertRaises(RuntimeError):
+            await svc.chat("hi")
+        self.assertEqual(len(attempts), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+TaskPlannerAgent 계획 캐시(PlanCache) 테스트.
+
+실행:
+  cd code/backend/chatbot-service && python -m unittest discover -s tests
+"""
+
+import json
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+SERVICE_DIR = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(SERVICE_DIR), str(SERVICE_DIR.parent)]
+
+from agents.task_planner_agent import PlanCache, TaskPlannerAgent  # noqa: E402
+
+INTENT, APIS = "calendar", ["calendar.create_event"]
+
+
+def _plan(args: dict, text: str = "일정 생성") -> dict:
+    return {"tasks": [{"id": "t1", "text": text, "tool": "calendar.create_event", "args": args}], "final_step": "t1"}
+
+
+def _args(plan: dict) -> dict:
+    return plan["tasks"][0]["args"]
+
+
+class PlanCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = PlanCache()
+
+    def _put(self, user_input: str, plan: dict, recent_turns=None) -> None:
+        self.cache.put(user_input=user_input, intent=INTENT, apis=APIS, plan=plan, recent_turns=recent_turns)
+
+    def _get(self, user_input: str, recent_turns=None):
+        return self.cache.get(user_input=user_input, intent=INTENT, apis=APIS, recent_turns=recent_turns)
+
+    def test_same_skeleton_shares_entry(self):
+        self._put("3시에 회의 잡아줘", _plan({}, text="3시 회의 생성"))
+        hit = self._get("5시에 회의 잡아줘")
+        self.assertIsNotNone(hit)
+        self.assertEqual(hit["tasks"][0]["text"], "5시 회의 생성")
+        self.assertIsNone(self._get("5시에 점심 잡아줘"))
+        self.assertIsNone(self.cache.get(user_input="5시에 회의 잡아줘", intent=INTENT, apis=["rag.query"]))
+
+    def test_exact_variable_args_are_rebound(self):
+        self._put('3시에 "주간회의" 잡아줘', _plan({"title": "주간회의", "hour": 3}))
+        hit = self._get('13시에 "리뷰" 잡아줘')
+        self.assertEqual(_args(hit), {"title": "리뷰", "hour": 13})
+
+    def test_verbatim_input_arg_is_rebound(self):
+        self._put("3시 회의 자료 찾아줘", _plan({"query": "3시 회의 자료 찾아줘"}))
+        self.assertEqual(_args(self._get("5시 회의 자료 찾아줘")), {"query": "5시 회의 자료 찾아줘"})
+
+    def test_derived_args_are_not_reused(self):
+        # "오후 3시" -> "15:00"처럼 해석된 값은 입력 변수로 다시 만들 수 없으므로 저장하지 않음
+        self._put("오후 3시에 회의 잡아줘", _plan({"start_time": "15:00"}))
+        self.assertIsNone(self._get("오후 5시에 회의 잡아줘"))
+        # "내일" -> 날짜도 마찬가지 (다음 날 같은 요청에 지난 날짜가 재사용되면 안 됨)
+        self._put("내일 회의 잡아줘", _plan({"date": "2026-10-16"}))
+        self.assertIsNone(self._get("내일 회의 잡아줘"))
+
+    def test_rebind_clears_args_it_cannot_derive(self):
+        # 저장 필터를 거치지 않은 항목이라도, 히트 시 바꿀 수 없는 인자가 있으면 args를 비워 실행기가 다시 채우게 함
+        task = {"id": "t1", "text": "3시", "args": {"title": "3", "start_time": "15:00"}}
+        PlanCache._rebind_task(task, "오후 3시에 회의 잡아줘", "오후 5시에 회의 잡아줘", {"3": "5"}, [("3", "5")])
+        self.assertEqual(task, {"id": "t1", "text": "5시", "args": {}})
+
+    def test_no_reuse_across_recent_turns(self):
+        turns_a = [{"role": "user", "content": "회의록.pdf 요약해줘"}]
+        turns_b = [{"role": "user", "content": "예산안.xlsx 열어줘"}]
+        self._put("그거 슬랙으로 공유해줘", _plan({}), recent_turns=turns_a)
+        self.assertIsNotNone(self._get("그거 슬랙으로 공유해줘", recent_turns=turns_a))
+        self.assertIsNone(self._get("그거 슬랙으로 공유해줘", recent_turns=turns_b))
+        self.assertIsNone(self._get("그거 슬랙으로 공유해줘"))
+
+    def test_entries_expire(self):
+        cache = PlanCache(ttl_seconds=10)
+        with mock.patch("agents.task_planner_agent.time.monotonic", return_value=100.0):
+            cache.put(user_input="3시에 회의 잡아줘", intent=INTENT, apis=APIS, plan=_plan({}))
+        with mock.patch("agents.task_planner_agent.time.monotonic", return_value=105.0):
+            self.assertIsNotNone(cache.get(user_input="3시에 회의 잡아줘", intent=INTENT, apis=APIS))
+        with mock.patch("agents.task_planner_agent.time.monotonic", return_value=111.0):
+            self.assertIsNone(cache.get(user_input="3시에 회의 잡아줘", intent=INTENT, apis=APIS))
+
+
+class PlannerCacheTest(unittest.IsolatedAsyncioTestCase):
+    async def test_plan_uses_cache_per_recent_turns(self):
+        calls: list = []
+
+        async def llm_chat(system: str, user: str) -> str:
+            calls.append(user)
+            return json.dumps(_plan({"title": "3"}), ensure_ascii=False)
+
+        planner = TaskPlannerAgent(llm_chat_fn=llm_chat, tools_prompt="-", plan_cache=PlanCache())
+        turns = [{"role": "user", "content": "안녕"}]
+
+        await planner.plan(user_input="3시에 회의 잡아줘", intent=INTENT, apis=APIS, recent_turns=turns)
+        plan = await planner.plan(user_input="5시에 회의 잡아줘", intent=INTENT, apis=APIS, recent_turns=turns)
+        self.assertEqual(_args(plan), {"title": "5"})
+        self.assertEqual(len(calls), 1)
+
+        await planner.plan(user_input="5시에 회의 잡아줘", intent=INTENT, apis=APIS, recent_turns=[])
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -317,12 +317,22 @@ async def create_file(file_data: FileCreate):
     return new_file
 
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel
 from datetime import datetime
 from typing import Dict, List, Optional
 
+try:  # optional: orjson이 있으면 응답 직렬화를 ORJSONResponse로 처리
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
 
-app = FastAPI(title="File Service (Mock)", version="1.0.0")
+
+app = FastAPI(
+    title="File Service (Mock)",
+    version="1.0.0",
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse,
+)
 
 
 class FileInfo(BaseModel):
@@ -378,8 +388,7 @@ async def root():
     return {"service": "file-service", "status": "running"}
 
 
-@app.get("/files/search", response_model=SearchResult)
-async def search_files(q: str, tags: Optional[str] = None, file_type: Optional[str] = None):
+def run_search(q: str, tags: Optional[str] = None, file_type: Optional[str] = None) -> SearchResult:
     start = datetime.now()
     query_words = q.lower().split()
     matched: List[FileInfo] = []
@@ -409,6 +418,21 @@ async def search_files(q: str, tags: Optional[str] = None, file_type: Optional[s
     return SearchResult(files=matched, total_matches=len(matched), query=q, search_time_ms=ms)
 
 
+@app.get("/files/search", response_model=SearchResult)
+async def search_files(q: str, tags: Optional[str] = None, file_type: Optional[str] = None):
+    return run_search(q, tags, file_type)
+
+
+class SearchBatchRequest(BaseModel):
+    queries: List[str]
+
+
+@app.post("/files/search/batch")
+async def search_files_batch(req: SearchBatchRequest):
+    """여러 검색어를 한 번의 요청으로 처리합니다. results[i]는 queries[i]의 결과."""
+    return {"results": [run_search(q) for q in req.queries]}
+
+
 @app.get("/files/content/{file_id}")
 async def get_file_content(file_id: str):
     if file_id not in FILES:
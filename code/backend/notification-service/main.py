@@ -13,9 +13,19 @@ from typing import Dict, List, Optional
 import uuid
 
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel
 
-app = FastAPI(title="Notification Service (Mock)", version="1.0.0")
+try:  # optional: orjson이 있으면 응답 직렬화를 ORJSONResponse로 처리
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+app = FastAPI(
+    title="Notification Service (Mock)",
+    version="1.0.0",
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse,
+)
 
 
 class NotificationCreate(BaseModel):
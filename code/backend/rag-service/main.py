@@ -21,6 +21,8 @@ qdrant = RagQdrantStore()
 # BM25 인덱스는 메모리 캐시로 유지합니다(인덱싱 시점에 갱신).
 _bm25 = BM25Index()
 _bm25_lock = threading.Lock()
+# 핸들러가 스레드풀에서 동시에 돌 수 있으므로, 빈 컬렉션 자동 인덱싱은 한 요청만 수행합니다.
+_auto_index_lock = threading.Lock()
 
 def _cors_origins() -> list[str]:
     raw = os.getenv("RAG_CORS_ORIGINS", "")
@@ -122,6 +124,16 @@ def _maybe_auto_index(*, min_points: int = 20, max_files: int = 200) -> dict[str
     if count >= min_points:
         return {"auto_indexed": False, "points": count}
 
+    with _auto_index_lock:
+        # 락을 기다리는 동안 다른 요청이 이미 인덱싱했을 수 있으므로 다시 확인
+        count = qdrant.count_points()
+        if count >= min_points:
+            return {"auto_indexed": False, "points": count}
+        return _auto_index_docs(count=count, max_files=max_files)
+
+
+def _auto_index_docs(*, count: int, max_files: int) -> dict[str, Any]:
+    """repo의 docs/를 인덱싱합니다. (_auto_index_lock 안에서만 호출)"""
     repo_root = _repo_root()
     docs_root = repo_root / "docs"
     if not docs_root.exists():
@@ -192,8 +204,11 @@ def _build_preview(*, chunks: list[dict[str, Any]], preview_files: int, preview_
     return out
 
 
+# NOTE: 아래 핸들러들은 Qdrant/임베딩(OpenAI) 동기 클라이언트를 호출하므로 `async def`가 아닌 `def`로 둡니다.
+# FastAPI가 def 핸들러를 공용 스레드풀에서 실행하므로, 느린 임베딩/검색 호출이 이벤트 루프를 막지 않고
+# 다른 요청(/health 등)이 동시에 처리됩니다. (공유 상태는 _bm25_lock/_auto_index_lock으로 보호)
 @app.get("/health")
-async def health():
+def health():
     """
     Qdrant 연결/설정 상태를 확인하는 헬스체크입니다.
     """
@@ -475,7 +490,7 @@ def _hybrid_search(query: str, *, top_k: int, filters: Optional[Dict[str, Any]])
 
 
 @app.post("/rag/query")
-async def rag_query(req: QueryRequest):
+def rag_query(req: QueryRequest):
     try:
         auto = {"auto_indexed": False}
         if req.auto_index:
@@ -543,7 +558,7 @@ async def rag_query(req: QueryRequest):
 
 
 @app.post("/rag/index/docs")
-async def index_docs(req: IndexRequest):
+def index_docs(req: IndexRequest):
     repo_root = _repo_root()
     default_docs = repo_root / "docs"
     docs_root = Path(req.docs_root) if req.docs_root else default_docs
@@ -615,7 +630,7 @@ async def index_docs(req: IndexRequest):
 
 
 @app.post("/rag/index/qdrant-embedding-docs")
-async def index_qdrant_embedding_docs(req: IndexRequest):
+def index_qdrant_embedding_docs(req: IndexRequest):
     """
     레포 전용 편의 엔드포인트:
     - repo 루트의 `qdrant_embedding_docs/` 를 Qdrant에 인덱싱합니다.
@@ -144,6 +144,21 @@ def _stop_listeners_on_port(port: int, *, timeout_s: float = 2.0) -> tuple[bool,
     return False, f"port still in use (pid(s) {pids})"
 
 
+def _fast_server_args() -> list[str]:
+    """
+    uvloop(libuv 이벤트 루프) / httptools(C HTTP 파서)가 설치돼 있으면 uvicorn에 명시적으로 지정합니다.
+    uvicorn[standard]가 둘 다 설치하지만, 없는 환경에서는 기본(asyncio/h11)으로 동작합니다.
+    """
+    import importlib.util
+
+    args: list[str] = []
+    if sys.platform != "win32" and importlib.util.find_spec("uvloop") is not None:
+        args += ["--loop", "uvloop"]
+    if importlib.util.find_spec("httptools") is not None:
+        args += ["--http", "httptools"]
+    return args
+
+
 def start_service(backend_dir: Path, svc: dict) -> ServiceStartResult:
     name = svc["name"]
     port = svc["port"]
@@ -190,6 +205,7 @@ def start_service(backend_dir: Path, svc: dict) -> ServiceStartResult:
         "--port",
         str(port),
         "--reload",
+        *_fast_server_args(),
     ]
 
     print(f"🚀 starting {name} on :{port} (cwd={cwd})")
@@ -235,13 +235,23 @@ async def current_simple(city: str):
     }
 
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel
 import random
 from datetime import datetime, timedelta
 from typing import List
 
+try:  # optional: orjson이 있으면 응답 직렬화를 ORJSONResponse로 처리
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
 
-app = FastAPI(title="Weather Service (Mock)", version="1.0.0")
+
+app = FastAPI(
+    title="Weather Service (Mock)",
+    version="1.0.0",
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse,
+)
 
 
 class WeatherInfo(BaseModel):